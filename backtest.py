@@ -0,0 +1,181 @@
+# backtest.py
+#
+#   python backtest.py --timeframe 30m --horizons 1 4 12 --output trades.csv
+#
+# Replays the weighted buy score over stored candle history. The score is evaluated at
+# every bar in vectorized passes, coins are split across a process pool, and the result
+# is one row per simulated entry.
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from batch_indicator_engine import BatchIndicatorEngine
+from candle_series import CandleSeries
+from config import BUY_THRESHOLD
+from indicator_engine_v2 import INDICATOR_WEIGHTS
+
+# The scanner's buy range around the signal price
+BUY_RANGE = (0.985, 1.015)
+# Bars after the signal in which price has to trade into the buy range
+FILL_WINDOW = 3
+HORIZONS = (1, 4, 12)
+CHUNK_SIZE = 64
+
+def weighted_score_panel(panel, weights=INDICATOR_WEIGHTS):
+    # weighted_score at every bar: absent subscores drop out of the average, RSI is rounded first
+    total = None
+    weight_total = None
+    for name, w in weights.items():
+        values = np.round(panel[name], 2) if name == 'RSI' else panel[name]
+        present = ~np.isnan(values)
+        contribution = np.where(present, values * w, 0.0)
+        total = contribution if total is None else total + contribution
+        weight_total = np.where(present, w, 0.0) if weight_total is None else weight_total + np.where(present, w, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(weight_total > 0, np.round(total / weight_total, 2), 0.0)
+
+def _panel(series_list, field, width, dtype=np.float64, fill=np.nan):
+    out = np.full((len(series_list), width), fill, dtype=dtype)
+    for row, series in enumerate(series_list):
+        values = getattr(series, field)
+        if values is not None and len(values):
+            out[row, width - len(values):] = values
+    return out
+
+def backtest_chunk(coin_ids, series_list, threshold=BUY_THRESHOLD, horizons=HORIZONS, fill_window=FILL_WINDOW,
+                   buy_range=BUY_RANGE, weights=INDICATOR_WEIGHTS):
+    # Returns a dict of equal-length columns, one entry per simulated trade
+    series_list = [s.dropna() for s in series_list]
+    width = max((len(s) for s in series_list), default=0)
+    columns = {name: [] for name in ["coin_id", "signal_time", "score", "signal_price", "fill_time", "fill_price"]}
+    for h in horizons:
+        columns[f"ret_{h}"] = []
+    if width < 2:
+        return {k: np.asarray(v) for k, v in columns.items()}
+
+    ts = _panel(series_list, "timestamp", width, np.int64, -1)
+    open_, high, low, close = (_panel(series_list, f, width) for f in ("open", "high", "low", "close"))
+    has_volume = any(s.volume is not None for s in series_list)
+    volume = _panel(series_list, "volume", width) if has_volume else None
+    engine = BatchIndicatorEngine(close, high, low, volume, coin_ids=coin_ids)
+
+    score = weighted_score_panel(engine.subscore_panel(), weights)
+    score[np.isnan(close)] = np.nan
+    prev = np.concatenate([np.full((len(close), 1), np.nan), score[:, :-1]], axis=1)
+    with np.errstate(invalid="ignore"):
+        entries = (prev < threshold) & (score >= threshold)
+    rows, bars = np.nonzero(entries)
+    if len(rows) == 0:
+        return {k: np.asarray(v) for k, v in columns.items()}
+
+    range_low = close[rows, bars] * buy_range[0]
+    range_high = close[rows, bars] * buy_range[1]
+    # First bar within the fill window whose high/low overlaps the buy range
+    fill_bar = np.full(len(rows), -1)
+    fill_price = np.full(len(rows), np.nan)
+    for k in range(1, fill_window + 1):
+        j = bars + k
+        valid = (j < width) & (fill_bar < 0)
+        jj = np.minimum(j, width - 1)
+        with np.errstate(invalid="ignore"):
+            touched = valid & (low[rows, jj] <= range_high) & (high[rows, jj] >= range_low)
+        fill_bar = np.where(touched, j, fill_bar)
+        fill_price = np.where(touched, np.clip(open_[rows, jj], range_low, range_high), fill_price)
+
+    filled = fill_bar >= 0
+    rows, bars, fill_bar, fill_price = rows[filled], bars[filled], fill_bar[filled], fill_price[filled]
+    ids = np.asarray(coin_ids, dtype=object)
+    columns = {
+        "coin_id": ids[rows],
+        "signal_time": ts[rows, bars],
+        "score": score[rows, bars],
+        "signal_price": close[rows, bars],
+        "fill_time": ts[rows, fill_bar],
+        "fill_price": fill_price,
+    }
+    for h in horizons:
+        exit_bar = fill_bar + h
+        ret = np.full(len(rows), np.nan)
+        inside = exit_bar < width
+        ret[inside] = close[rows[inside], exit_bar[inside]] / fill_price[inside] - 1
+        columns[f"ret_{h}"] = ret
+    return columns
+
+def _run_chunk(args):
+    coin_ids, payload, kwargs = args
+    # CandleSeries has __slots__ and pickles as plain arrays
+    series_list = [CandleSeries(*arrays) for arrays in payload]
+    return backtest_chunk(coin_ids, series_list, **kwargs)
+
+def run_backtest(candles, workers=None, chunk_size=CHUNK_SIZE, **kwargs):
+    # candles: {coin_id: CandleSeries or DataFrame}. Returns one row per filled entry with
+    # forward returns ret_<h> for each horizon h in bars; workers=1 runs in-process.
+    items = [(coin_id, s if isinstance(s, CandleSeries) else CandleSeries.from_frame(s)) for coin_id, s in candles.items()]
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    tasks = [([c for c, _ in chunk],
+              [tuple(getattr(s, f) for f in CandleSeries.__slots__) for _, s in chunk],
+              kwargs) for chunk in chunks]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        results = [_run_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(_run_chunk, tasks))
+    frames = [pd.DataFrame(result) for result in results if len(result["coin_id"])]
+    if not frames:
+        return pd.DataFrame(columns=list(backtest_chunk([], [], **kwargs)))
+    trades = pd.concat(frames, ignore_index=True)
+    for col in ("signal_time", "fill_time"):
+        trades[col] = pd.to_datetime(trades[col], unit="ms")
+    return trades
+
+def summarize(trades, by="coin_id", freq=None):
+    # Entry count, mean forward return and hit rate (share of positive returns) per horizon,
+    # grouped by coin (by="coin_id") or by signal period (by="period", freq like "1D" or "W")
+    if by == "period":
+        keys = trades["signal_time"].dt.floor(freq or "1D").rename("period")
+    else:
+        keys = trades[by]
+    grouped = trades.groupby(keys)
+    out = pd.DataFrame({"entries": grouped.size()})
+    for col in [c for c in trades.columns if c.startswith("ret_")]:
+        h = col[len("ret_"):]
+        out[f"mean_ret_{h}"] = grouped[col].mean()
+        out[f"hit_rate_{h}"] = grouped[col].apply(lambda r: (r.dropna() > 0).mean() if r.notna().any() else np.nan)
+    return out
+
+def main():
+    from config import TOP_N_COINS
+    from fetcher import get_candle_store, FINEST_TIMEFRAME
+    from resample import resample, TIMEFRAME_MS
+
+    parser = argparse.ArgumentParser(description="Backtest the weighted buy score over stored candles")
+    parser.add_argument("--timeframe", default="30m", choices=list(TIMEFRAME_MS))
+    parser.add_argument("--coins", nargs="+", help="default: every coin in the candle store")
+    parser.add_argument("--max-coins", type=int, default=TOP_N_COINS)
+    parser.add_argument("--threshold", type=float, default=BUY_THRESHOLD)
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(HORIZONS))
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--output", help="write trades as .csv or .parquet")
+    args = parser.parse_args()
+
+    candle_store = get_candle_store()
+    coin_ids = args.coins or candle_store.coin_ids("usd", FINEST_TIMEFRAME)[:args.max_coins]
+    candles = {c: resample(candle_store.load(c, "usd", FINEST_TIMEFRAME, as_series=True), args.timeframe)
+               for c in coin_ids}
+    trades = run_backtest(candles, workers=args.workers, chunk_size=args.chunk_size, threshold=args.threshold,
+                          horizons=tuple(args.horizons))
+    print(f"{len(trades)} entries across {trades['coin_id'].nunique() if len(trades) else 0} coins")
+    if len(trades):
+        print(summarize(trades.assign(all="all"), by="all").to_string())
+    if args.output:
+        if args.output.endswith(".parquet"):
+            trades.to_parquet(args.output)
+        else:
+            trades.to_csv(args.output, index=False)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+
+import numpy as np
+import indicator_kernels as K
+from indicator_engine_v2 import INDICATOR_WEIGHTS
+
+INDICATORS = list(INDICATOR_WEIGHTS)
+
+class BatchIndicatorEngine:
+    # Scores a whole panel of coins in vectorized passes; subscores and weighted
+    # scores match IndicatorEngineV2 run on each coin separately
+    def __init__(self, close, high=None, low=None, volume=None, coin_ids=None, forming=None):
+        self.close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+        self.high = self.close if high is None else np.atleast_2d(np.asarray(high, dtype=np.float64))
+        self.low = self.close if low is None else np.atleast_2d(np.asarray(low, dtype=np.float64))
+        self.volume = None if volume is None else np.atleast_2d(np.asarray(volume, dtype=np.float64))
+        self.coin_ids = list(coin_ids) if coin_ids is not None else list(range(len(self.close)))
+        self.start = K.first_valid_index(self.close)
+        # Coins whose last candle is still forming score Volume at the candle before it
+        self.forming = np.zeros(len(self.close), dtype=bool) if forming is None else np.asarray(forming, dtype=bool)
+        self.panel = None
+
+    @classmethod
+    def from_frames(cls, frames):
+        # frames: {coin_id: OHLC(V) DataFrame}; histories of different lengths are right-aligned
+        frames = {coin_id: df.dropna() for coin_id, df in frames.items()}
+        coin_ids = list(frames)
+        width = max((len(df) for df in frames.values()), default=0)
+        arrays = {col: np.full((len(coin_ids), width), np.nan) for col in ["open", "high", "low", "close", "volume"]}
+        has_volume = False
+        for row, coin_id in enumerate(coin_ids):
+            df = frames[coin_id]
+            n = len(df)
+            if n == 0:
+                continue
+            for col in arrays:
+                if col in df.columns:
+                    arrays[col][row, width - n:] = df[col].to_numpy(dtype=np.float64)
+            has_volume = has_volume or "volume" in df.columns
+        return cls(arrays["close"], arrays["high"], arrays["low"],
+                   arrays["volume"] if has_volume else None, coin_ids=coin_ids)
+
+    @classmethod
+    def from_series(cls, coin_ids, series_list):
+        # Same as from_frames for CandleSeries already passed through dropna()
+        width = max((len(s) for s in series_list), default=0)
+        arrays = {col: np.full((len(series_list), width), np.nan) for col in ["high", "low", "close", "volume"]}
+        has_volume = False
+        forming = np.array([bool(series.forming) for series in series_list], dtype=bool)
+        for row, series in enumerate(series_list):
+            n = len(series)
+            for col in arrays:
+                values = getattr(series, col)
+                if n and values is not None:
+                    arrays[col][row, width - n:] = values
+            has_volume = has_volume or series.volume is not None
+        return cls(arrays["close"], arrays["high"], arrays["low"],
+                   arrays["volume"] if has_volume else None, coin_ids=coin_ids, forming=forming)
+
+    def subscore_panel(self):
+        # Per-candle subscores, shaped (coins, candles), NaN where IndicatorEngineV2 returns None
+        if self.panel is not None:
+            return self.panel
+        close = self.close
+        age = np.arange(close.shape[1])[None, :] - self.start[:, None]
+        exists = age >= 0
+        crossed = age >= 1
+
+        rsi = K.rsi(close)
+        rsi_score = np.clip((70 - rsi) * (100 / 40), 0, 100)
+
+        macd_line, signal_line = K.macd(close)
+        with np.errstate(invalid="ignore"):
+            macd_cross = (K.shift(macd_line) < K.shift(signal_line)) & (macd_line > signal_line)
+        macd_score = np.where(crossed, np.where(macd_cross, 100.0, 30.0), np.nan)
+
+        ema = K.ema(close, 50)
+        with np.errstate(invalid="ignore"):
+            ema_score = np.where(exists, np.where(close > ema, 100.0, 30.0), np.nan)
+
+        if self.volume is not None:
+            avg_vol = K.rolling_mean(self.volume, 20)
+            with np.errstate(invalid="ignore"):
+                volume_score = np.where(self.volume > avg_vol * 1.3, 100.0,
+                                        np.where(self.volume > avg_vol, 60.0, 30.0))
+            no_volume = np.isnan(self.volume).all(axis=1)
+            volume_score[~exists | no_volume[:, None]] = np.nan
+            if self.forming.any():
+                volume_score[self.forming, -1] = volume_score[self.forming, -2] if close.shape[1] > 1 else np.nan
+        else:
+            volume_score = np.full_like(close, np.nan)
+
+        stoch = K.stoch_rsi_k(rsi)
+        with np.errstate(invalid="ignore"):
+            stoch_cross = (K.shift(stoch) < 0.2) & (stoch > 0.2)
+        stoch_score = np.where(crossed, np.where(stoch_cross, 100.0, 30.0), np.nan)
+
+        adx = K.adx(self.high, self.low, close)
+        with np.errstate(invalid="ignore"):
+            adx_score = np.where(adx > 25, 100.0, np.where(adx > 20, 60.0, 30.0))
+        adx_score[np.isnan(adx)] = np.nan
+
+        self.panel = {
+            'RSI': rsi_score,
+            'MACD': macd_score,
+            'EMA': ema_score,
+            'Volume': volume_score,
+            'StochRSI': stoch_score,
+            'ADX': adx_score,
+        }
+        return self.panel
+
+    def subscore_matrix(self):
+        # Latest subscores as a (coins, indicators) matrix in INDICATORS order
+        if self.close.shape[1] == 0:
+            return np.full((len(self.coin_ids), len(INDICATORS)), np.nan)
+        panel = self.subscore_panel()
+        return np.column_stack([panel[name][:, -1] for name in INDICATORS])
+
+    def calculate_all(self):
+        return dict(zip(self.coin_ids, subscore_records(self.subscore_matrix())))
+
+    def calculate_weighted_score(self, weights=INDICATOR_WEIGHTS):
+        return dict(zip(self.coin_ids, weighted_scores(self.subscore_matrix(), weights)))
+
+def subscore_records(matrix):
+    # Rows of a subscore matrix as the dicts IndicatorEngineV2.calculate_all returns
+    records = []
+    for row in np.asarray(matrix, dtype=np.float64):
+        scores = {}
+        for col, name in enumerate(INDICATORS):
+            value = row[col]
+            if np.isnan(value):
+                scores[name] = None
+            elif name == 'RSI':
+                scores[name] = float(np.round(value, 2))
+            else:
+                scores[name] = int(value)
+        records.append(scores)
+    return records
+
+def weighted_scores(matrix, weights=INDICATOR_WEIGHTS):
+    # Same accumulation order and rounding as indicator_engine_v2.weighted_score. The
+    # per-coin engine's RSI score is a numpy float unless clamped to 0/100, which makes
+    # round() use numpy's rounding for the RSI score and any total it contributes to.
+    matrix = np.asarray(matrix, dtype=np.float64)
+    rsi = matrix[:, INDICATORS.index('RSI')]
+    numpy_rounding = (rsi > 0) & (rsi < 100) & ('RSI' in weights)
+    total = np.zeros(len(matrix))
+    weight_total = np.zeros(len(matrix))
+    for name, w in weights.items():
+        values = matrix[:, INDICATORS.index(name)]
+        if name == 'RSI':
+            values = np.round(values, 2)
+        present = ~np.isnan(values)
+        total = np.where(present, total + np.nan_to_num(values) * w, total)
+        weight_total = np.where(present, weight_total + w, weight_total)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        averages = total / weight_total
+    return [
+        0.0 if wt <= 0 else float(np.round(avg, 2)) if np_round else round(float(avg), 2)
+        for avg, wt, np_round in zip(averages, weight_total, numpy_rounding)
+    ]
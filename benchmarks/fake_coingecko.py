@@ -0,0 +1,101 @@
+# benchmarks/fake_coingecko.py
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from benchmarks.synthetic import ohlc_payload, market_chart_payload, market_rows
+
+class FakeCoinGeckoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency_ms = 0.0
+    jitter_ms = 0.0
+    error_rate = 0.0
+    # Share of requests that take slow_ms longer, to reproduce a degraded API's tail
+    slow_rate = 0.0
+    slow_ms = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if random.random() < self.slow_rate:
+            delay += self.slow_ms
+        if delay:
+            time.sleep(delay / 1000)
+        if random.random() < self.error_rate:
+            return self._send(random.choice([429, 500, 503]), {"error": "injected failure"})
+
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+        if parts[:3] == ["api", "v3", "coins"]:
+            parts = parts[3:]
+        elif parts[:1] == ["coins"]:
+            parts = parts[1:]
+        now_ms = int(time.time() * 1000)
+
+        if parts == ["markets"]:
+            body = market_rows(int(query.get("per_page", 100)), int(query.get("page", 1)))
+        elif len(parts) == 2 and parts[1] == "ohlc":
+            body = ohlc_payload(parts[0], query.get("days", "1"), now_ms)
+        elif len(parts) == 2 and parts[1] == "market_chart":
+            body = market_chart_payload(parts[0], now_ms - int(float(query.get("days", "1")) * 86400 * 1000), now_ms)
+        elif len(parts) == 3 and parts[1:] == ["market_chart", "range"]:
+            body = market_chart_payload(parts[0], int(query["from"]) * 1000, int(query["to"]) * 1000)
+        elif len(parts) == 1:
+            body = {"id": parts[0], "market_data": {"price_change_percentage_1h_in_currency": {"usd": random.gauss(0, 1)}}}
+        else:
+            return self._send(404, {"error": "not found"})
+        self._send(200, body)
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            payload = gzip.compress(payload, compresslevel=1)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+def start_server(host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, slow_rate=0.0,
+                 slow_ms=0.0):
+    # Returns (server, base_url); port 0 picks a free port. Call server.shutdown() to stop it.
+    handler = type("Handler", (FakeCoinGeckoHandler,),
+                   {"latency_ms": latency_ms, "jitter_ms": jitter_ms, "error_rate": error_rate,
+                    "slow_rate": slow_rate, "slow_ms": slow_ms})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/api/v3"
+
+def main():
+    parser = argparse.ArgumentParser(description="Local CoinGecko stand-in serving synthetic data")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    server, base_url = start_server(port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                    error_rate=args.error_rate, slow_rate=args.slow_rate, slow_ms=args.slow_ms)
+    print(f"Fake CoinGecko at {base_url} (set COINGECKO_API_BASE to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
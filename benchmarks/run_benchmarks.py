@@ -0,0 +1,129 @@
+# benchmarks/run_benchmarks.py
+#
+#   python -m benchmarks.run_benchmarks --sizes 50 300 --output bench.json
+#
+# Runs against a local fake CoinGecko server, so no API quota is spent.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_coingecko import start_server
+from benchmarks.synthetic import ohlcv_frame
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def summarize(name, durations, **extra):
+    return {
+        "name": name,
+        "runs": len(durations),
+        "total_s": round(sum(durations), 6),
+        "mean_ms": round(statistics.mean(durations) * 1000, 3),
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p95_ms": round(percentile(durations, 95) * 1000, 3),
+        "max_ms": round(max(durations) * 1000, 3),
+        **extra,
+    }
+
+def timed(fn, repeat, before=None):
+    durations = []
+    for _ in range(repeat):
+        if before:
+            before()
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scan benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 300, 1000, 5000])
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of requests delayed by --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--candles", type=int, default=288)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    server, base_url = start_server(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                                    slow_rate=args.slow_rate, slow_ms=args.slow_ms)
+    # config reads these at import time, so set them before importing the app modules
+    os.environ["COINGECKO_API_BASE"] = base_url
+    os.environ["CRYPTO_SIGNALS_DATA_DIR"] = tempfile.mkdtemp(prefix="crypto-bench-")
+
+    import fetcher
+    import http_client
+    import scanner
+    from candle_store import CandleStore
+    from config import MAX_CONCURRENT_FETCHES
+    from indicator_engine_v2 import IndicatorEngineV2
+    from rate_limiter import TokenBucket
+
+    # The stand-in has no quota; keep the limiter out of the measurements, hedges and retries included
+    fetcher.rate_limiter = http_client.resilience.limiter = TokenBucket(10_000_000)
+
+    results = []
+    # Identical requests are coalesced for a few seconds; start a new cycle so every run hits the server
+    results.append(summarize("get_top_gainers", timed(fetcher.get_top_gainers, args.repeat, http_client.new_cycle)))
+    results.append(summarize("get_ohlc_data", timed(lambda: fetcher.get_ohlc_data("coin-1"), args.repeat,
+                                                    http_client.new_cycle)))
+    results.append(summarize("get_ohlc_data[market_chart]",
+                             timed(lambda: fetcher.get_ohlc_data("coin-1", use_market_chart=True), args.repeat,
+                                   http_client.new_cycle)))
+
+    frames = [ohlcv_frame(args.candles, seed=i) for i in range(args.repeat)]
+    engine_runs = iter(frames)
+    results.append(summarize("IndicatorEngineV2.calculate_all",
+                             timed(lambda: IndicatorEngineV2(next(engine_runs)).calculate_all(), len(frames)),
+                             candles=args.candles))
+
+    for size in args.sizes:
+        # Fresh candle store per size: the first scan is cold, the second is served from disk
+        fetcher.candle_store = CandleStore(os.path.join(os.environ["CRYPTO_SIGNALS_DATA_DIR"], f"scan-{size}.db"))
+        for label in ["cold", "warm"]:
+            http_client.new_cycle()
+            started = time.perf_counter()
+            signals = scanner.run_scan(period="1h", use_market_chart=False, top_n=size)
+            elapsed = time.perf_counter() - started
+            results.append({
+                "name": f"full_scan[{label}]",
+                "coins": size,
+                "signals": len(signals),
+                "total_s": round(elapsed, 6),
+                "per_coin_ms": round(elapsed / size * 1000, 3),
+            })
+
+    server.shutdown()
+    report = {
+        "generated_at": time.time(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": {
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "error_rate": args.error_rate,
+            "slow_rate": args.slow_rate,
+            "slow_ms": args.slow_ms,
+            "max_concurrent_fetches": MAX_CONCURRENT_FETCHES,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/synthetic.py
+
+import zlib
+import numpy as np
+
+def coin_seed(coin_id):
+    return zlib.crc32(coin_id.encode())
+
+def generate_ohlcv(n, interval_ms, end_ms, seed=0, start_price=None, volatility=0.01):
+    # Geometric random walk; returns an (n, 6) array of timestamp, open, high, low, close, volume
+    rng = np.random.default_rng(seed)
+    start_price = start_price or float(rng.uniform(0.01, 50000))
+    closes = start_price * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    opens = np.concatenate([[start_price], closes[:-1]])
+    wick = np.abs(rng.normal(0, volatility / 2, (2, n)))
+    highs = np.maximum(opens, closes) * (1 + wick[0])
+    lows = np.minimum(opens, closes) * (1 - wick[1])
+    volumes = rng.lognormal(mean=12, sigma=1, size=n) * start_price
+    timestamps = end_ms - interval_ms * np.arange(n - 1, -1, -1)
+    return np.column_stack([timestamps, opens, highs, lows, closes, volumes])
+
+def ohlcv_frame(n, interval_ms=30 * 60 * 1000, end_ms=1_700_000_000_000, seed=0, with_volume=True):
+    import pandas as pd
+    data = generate_ohlcv(n, interval_ms, end_ms, seed=seed)
+    df = pd.DataFrame(data, columns=["timestamp", "open", "high", "low", "close", "volume"])
+    df["timestamp"] = pd.to_datetime(df["timestamp"].astype("int64"), unit="ms")
+    return df if with_volume else df.drop(columns="volume")
+
+def ohlc_payload(coin_id, days, end_ms):
+    # CoinGecko /ohlc: 30m candles for 1-2 days, 4h up to 30 days, 4d beyond
+    days = float(days)
+    interval_ms = (30 * 60 * 1000) if days <= 2 else (4 * 3600 * 1000) if days <= 30 else (4 * 86400 * 1000)
+    n = max(1, int(days * 86400 * 1000 // interval_ms))
+    data = generate_ohlcv(n, interval_ms, end_ms - end_ms % interval_ms, seed=coin_seed(coin_id))
+    return [[int(row[0]), *row[1:5].round(8).tolist()] for row in data]
+
+def market_chart_payload(coin_id, from_ms, to_ms):
+    # CoinGecko /market_chart: 5-minutely within a day, hourly up to 90 days
+    span = to_ms - from_ms
+    interval_ms = (5 * 60 * 1000) if span <= 86400 * 1000 else (3600 * 1000)
+    n = max(1, int(span // interval_ms))
+    data = generate_ohlcv(n, interval_ms, to_ms - to_ms % interval_ms, seed=coin_seed(coin_id))
+    return {
+        "prices": [[int(ts), round(p, 8)] for ts, p in zip(data[:, 0], data[:, 4])],
+        "market_caps": [[int(ts), round(p * 1e7, 2)] for ts, p in zip(data[:, 0], data[:, 4])],
+        "total_volumes": [[int(ts), round(v, 2)] for ts, v in zip(data[:, 0], data[:, 5])],
+    }
+
+def market_rows(per_page, page):
+    rows = []
+    for rank in range((page - 1) * per_page + 1, page * per_page + 1):
+        coin_id = f"coin-{rank}"
+        rng = np.random.default_rng(coin_seed(coin_id))
+        price = float(rng.uniform(0.01, 50000))
+        rows.append({
+            "id": coin_id,
+            "symbol": f"c{rank}",
+            "name": f"Coin {rank}",
+            "image": "",
+            "current_price": price,
+            "market_cap": price * 1e7 / rank,
+            "market_cap_rank": rank,
+            "total_volume": price * float(rng.uniform(1e4, 1e6)),
+            "high_24h": price * float(rng.uniform(1.0, 1.1)),
+            "low_24h": price * float(rng.uniform(0.9, 1.0)),
+            "price_change_percentage_24h": float(rng.normal(0, 5)),
+            "price_change_percentage_1h_in_currency": float(rng.normal(0, 1)),
+            "price_change_percentage_24h_in_currency": float(rng.normal(0, 5)),
+            "price_change_percentage_7d_in_currency": float(rng.normal(0, 12)),
+        })
+    return rows
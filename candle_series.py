@@ -0,0 +1,132 @@
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+def to_array(rows, width):
+    # [[ts, v1, ...], ...] -> contiguous float64 (n, width) array; ms timestamps are exact in float64
+    if not rows:
+        return np.empty((0, width), dtype=np.float64)
+    return np.asarray(rows, dtype=np.float64).reshape(-1, width)
+
+class CandleSeries:
+    # One coin's candles as contiguous NumPy buffers: int64 ms timestamps and float64
+    # (or float32) prices. Built straight from the decoded API payload or SQLite rows, and
+    # read by IndicatorEngineV2 without the DataFrame copies. volume is None when absent;
+    # forming marks a last candle whose bucket has not closed yet (see resample).
+    __slots__ = ("timestamp", "open", "high", "low", "close", "volume", "forming")
+
+    def __init__(self, timestamp, open, high, low, close, volume=None, forming=False):
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.forming = forming
+
+    @classmethod
+    def empty_series(cls, dtype=np.float64):
+        blank = np.empty(0, dtype=dtype)
+        return cls(np.empty(0, dtype=np.int64), blank, blank, blank, blank)
+
+    @classmethod
+    def _from_matrix(cls, matrix, has_volume, dtype):
+        # matrix: (n, 5 or 6) float64 rows [ts, o, h, l, c(, v)]; transposing once gives
+        # every column its own contiguous row of a single buffer
+        if len(matrix) == 0:
+            return cls.empty_series(dtype)
+        columns = np.ascontiguousarray(matrix.T, dtype=dtype)
+        timestamp = matrix[:, 0].astype(np.int64)
+        volume = columns[5] if has_volume else None
+        return cls(timestamp, columns[1], columns[2], columns[3], columns[4], volume)
+
+    @classmethod
+    def from_ohlc_payload(cls, rows, dtype=np.float64):
+        # /coins/{id}/ohlc: [[ts, open, high, low, close], ...]
+        return cls._from_matrix(to_array(rows, 5), False, dtype)
+
+    @classmethod
+    def from_market_chart_payload(cls, payload, dtype=np.float64):
+        # /coins/{id}/market_chart(/range): close-only prices, so open/high/low share its buffer
+        prices = to_array(payload.get("prices", []), 2)
+        volumes = to_array(payload.get("total_volumes", []), 2)
+        n = min(len(prices), len(volumes))
+        if n == 0:
+            return cls.empty_series(dtype)
+        price = np.ascontiguousarray(prices[:n, 1], dtype=dtype)
+        volume = np.ascontiguousarray(volumes[:n, 1], dtype=dtype)
+        return cls(prices[:n, 0].astype(np.int64), price, price, price, price, volume)
+
+    @classmethod
+    def from_rows(cls, rows, dtype=np.float64):
+        # SQLite rows (timestamp, open, high, low, close, volume); NULL volume becomes NaN
+        if not rows:
+            return cls.empty_series(dtype)
+        matrix = np.array(rows, dtype=np.float64)
+        has_volume = not np.isnan(matrix[:, 5]).all()
+        return cls._from_matrix(matrix, has_volume, dtype)
+
+    @classmethod
+    def from_frame(cls, df, dtype=np.float64):
+        if df.empty:
+            return cls.empty_series(dtype)
+        # Without a timestamp column (indicators only need the order) rows are numbered instead
+        if "timestamp" in df.columns:
+            timestamps = df["timestamp"]
+            if pd.api.types.is_datetime64_any_dtype(timestamps):
+                timestamps = timestamps.astype("datetime64[ms]")
+            timestamps = timestamps.to_numpy().astype(np.int64)
+        else:
+            timestamps = np.arange(len(df), dtype=np.int64)
+        columns = [df[col].to_numpy(dtype=dtype) if col in df.columns else None for col in PRICE_COLUMNS]
+        volume = df["volume"].to_numpy(dtype=dtype) if "volume" in df.columns else None
+        return cls(timestamps, *columns, volume)
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    @property
+    def empty(self):
+        return len(self.timestamp) == 0
+
+    @property
+    def columns(self):
+        return ["timestamp"] + [col for col in PRICE_COLUMNS + ("volume",) if getattr(self, col) is not None]
+
+    def column(self, name):
+        values = getattr(self, name) if name in self.__slots__[:-1] else None
+        if values is None:
+            raise KeyError(name)
+        return values
+
+    @property
+    def nbytes(self):
+        # Shared buffers (market_chart's open/high/low/close) are counted once
+        seen = {}
+        for col in self.columns:
+            values = getattr(self, col)
+            seen[id(values.base if values.base is not None else values)] = (
+                values.base if values.base is not None else values).nbytes
+        return sum(seen.values())
+
+    def dropna(self):
+        # Same rows DataFrame.dropna() would keep; returns self when nothing is missing
+        present = [getattr(self, col) for col in self.columns[1:]]
+        if not present:
+            return self
+        missing = np.zeros(len(self), dtype=bool)
+        for values in present:
+            missing |= np.isnan(values)
+        if not missing.any():
+            return self
+        keep = ~missing
+        return CandleSeries(*(None if getattr(self, col) is None else getattr(self, col)[keep]
+                              for col in self.__slots__[:-1]), forming=self.forming and bool(keep[-1]))
+
+    def to_frame(self):
+        frame = {"timestamp": pd.to_datetime(self.timestamp, unit="ms")}
+        for col in self.columns[1:]:
+            frame[col] = getattr(self, col)
+        return pd.DataFrame(frame)
@@ -0,0 +1,95 @@
+
+import os
+import sqlite3
+import threading
+import pandas as pd
+from candle_series import CandleSeries
+
+# Candle spacing CoinGecko returns for days=1 on each endpoint
+GRANULARITY_MS = {
+    "30m": 30 * 60 * 1000,
+    "5m": 5 * 60 * 1000,
+}
+
+class CandleStore:
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS candles (
+                coin_id TEXT NOT NULL,
+                vs_currency TEXT NOT NULL,
+                granularity TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (coin_id, vs_currency, granularity, timestamp)
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+    def last_timestamp(self, coin_id, vs_currency, granularity):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MAX(timestamp) FROM candles WHERE coin_id=? AND vs_currency=? AND granularity=?",
+                (coin_id, vs_currency, granularity)).fetchone()
+        return row[0]
+
+    def is_fresh(self, coin_id, vs_currency, granularity, now_ms):
+        # No newer candle can exist until a full interval has passed since the last one we hold
+        last = self.last_timestamp(coin_id, vs_currency, granularity)
+        return last is not None and now_ms - last < GRANULARITY_MS[granularity]
+
+    def merge(self, coin_id, vs_currency, granularity, candles):
+        # candles: CandleSeries or OHLC(V) DataFrame
+        if candles.empty:
+            return 0
+        if not isinstance(candles, CandleSeries):
+            candles = CandleSeries.from_frame(candles)
+        last = self.last_timestamp(coin_id, vs_currency, granularity)
+        volume = candles.volume.tolist() if candles.volume is not None else [None] * len(candles)
+        rows = [
+            (coin_id, vs_currency, granularity, ts, o, h, l, c, None if v is None or v != v else v)
+            for ts, o, h, l, c, v in zip(candles.timestamp.tolist(), candles.open.tolist(), candles.high.tolist(),
+                                         candles.low.tolist(), candles.close.tolist(), volume)
+            # The last stored candle may still have been forming, so it is rewritten along with anything newer
+            if last is None or ts >= last
+        ]
+        with self._lock:
+            self.conn.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+        return len(rows)
+
+    def load(self, coin_id, vs_currency, granularity, since_ms=None, as_series=False):
+        query = ("SELECT timestamp, open, high, low, close, volume FROM candles "
+                 "WHERE coin_id=? AND vs_currency=? AND granularity=?")
+        params = [coin_id, vs_currency, granularity]
+        if since_ms is not None:
+            query += " AND timestamp >= ?"
+            params.append(int(since_ms))
+        with self._lock:
+            rows = self.conn.execute(query + " ORDER BY timestamp", params).fetchall()
+        if as_series:
+            return CandleSeries.from_rows(rows)
+        df = pd.DataFrame(rows, columns=["timestamp", "open", "high", "low", "close", "volume"])
+        if df.empty:
+            return pd.DataFrame()
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+        if df["volume"].isna().all():
+            df = df.drop(columns="volume")
+        return df
+
+    def coin_ids(self, vs_currency, granularity):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT coin_id FROM candles WHERE vs_currency=? AND granularity=? ORDER BY coin_id",
+                (vs_currency, granularity)).fetchall()
+        return [row[0] for row in rows]
+
+    def prune(self, before_ms):
+        with self._lock:
+            self.conn.execute("DELETE FROM candles WHERE timestamp < ?", (int(before_ms),))
+            self.conn.commit()
@@ -1,6 +1,71 @@
 
-import streamlit as st
+import os
+import tomllib
 
-COINGECKO_API_BASE = "https://pro-api.coingecko.com/api/v3"
+def _load_api_key():
+    # Headless processes must not import Streamlit, so read its secrets file directly
+    if os.environ.get("COINGECKO_API_KEY"):
+        return os.environ["COINGECKO_API_KEY"]
+    try:
+        with open(os.path.join(".streamlit", "secrets.toml"), "rb") as f:
+            return tomllib.load(f)["general"]["COINGECKO_API_KEY"]
+    except (OSError, KeyError, tomllib.TOMLDecodeError):
+        return ""
+
+COINGECKO_API_BASE = os.environ.get("COINGECKO_API_BASE", "https://pro-api.coingecko.com/api/v3")
 TOP_N_COINS = 300
-COINGECKO_API_KEY = st.secrets["general"]["COINGECKO_API_KEY"]
+COINGECKO_API_KEY = _load_api_key()
+HEADERS = {"x-cg-pro-api-key": COINGECKO_API_KEY}
+
+# CoinGecko Pro (Analyst plan) allows 500 calls per minute
+COINGECKO_RATE_LIMIT_PER_MIN = 500
+MAX_CONCURRENT_FETCHES = 8
+# Headroom over the fetch workers for hedged requests, whose slow originals keep their connection
+MAX_CONNECTIONS_PER_HOST = 2 * MAX_CONCURRENT_FETCHES
+# Identical requests within this many seconds (one dashboard run) share a response; the
+# scanner shares them for a whole cycle instead (http_client.new_cycle)
+COALESCE_WINDOW_SECONDS = 5
+
+DATA_DIR = os.environ.get("CRYPTO_SIGNALS_DATA_DIR", "data")
+CANDLE_STORE_PATH = f"{DATA_DIR}/candles.db"
+# Stored candles older than this are deleted by the scanner, at most once per prune interval
+CANDLE_RETENTION_DAYS = 30
+CANDLE_PRUNE_INTERVAL_SECONDS = 3600
+
+SNAPSHOT_DIR = f"{DATA_DIR}/snapshots"
+SCAN_INTERVAL_SECONDS = 120
+
+SIGNAL_STORE_PATH = f"{DATA_DIR}/signals.db"
+SIGNAL_RETENTION_DAYS = 30
+
+METRICS_PATH = f"{DATA_DIR}/metrics.prom"
+# The dashboard process exports its own metrics; the scanner's file stays METRICS_PATH
+DASHBOARD_METRICS_PATH = f"{DATA_DIR}/dashboard_metrics.prom"
+
+# OHLC refetches per minute the scanner's refresh scheduler may spend, shared across scan
+# modes; the rest of the plan quota is left for market lists and the dashboard
+REFRESH_BUDGET_PER_MIN = 400
+REFRESH_MIN_INTERVAL_SECONDS = 120
+REFRESH_MAX_INTERVAL_SECONDS = 3600
+
+# Scanner scoring processes; 0 scores each coin inline as its candles arrive
+SCORING_WORKERS = 0
+SCORING_CHUNK_SIZE = 64
+
+# Weighted buy score at which a coin counts as a buy signal
+BUY_THRESHOLD = 60
+
+# Points below the buy threshold a coin's market-data score bound may fall and still be
+# fetched; higher keeps more coins (recall), lower saves more OHLC requests (quota). The
+# scanner only prescreens when given --prescreen-margin; calibrate with prescreen.tradeoff
+# (prescreen.CROSS_POINTS or more skips nothing).
+PRESCREEN_MARGIN = 10.0
+
+# Seconds a shared dashboard cache entry is served as fresh; after that the last value
+# is still served while one background refresh runs. The dashboard only caches two kinds:
+# BTC prices, 1h change and sentiment are all derived from the one "ohlc" BTC series, and
+# the markets list is fetched inside the cached "scan", so neither has a TTL of its own.
+CACHE_TTL_SECONDS = {
+    "ohlc": 120,
+    "scan": SCAN_INTERVAL_SECONDS,
+}
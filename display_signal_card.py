@@ -1,4 +1,4 @@
-
+import html
 import streamlit as st
 
 def display_signal_card(signal):
@@ -51,3 +51,92 @@ def display_signal_card(signal):
 
     </div>
     """, unsafe_allow_html=True)
+
+def fmt(price):
+    if price >= 1:
+        return f"${price:.2f}"
+    elif price >= 0.1:
+        return f"${price:.3f}"
+    elif price >= 0.01:
+        return f"${price:.4f}"
+    else:
+        return f"${price:.5f}"
+
+# Fast card path: the gauge zones match the Plotly bar (weak < 60 <= moderate < 90 <= strong).
+# Styles are sent once per page and every card in a column goes out in one st.markdown call.
+CARD_STYLE = """
+<style>
+.sig-card{border:1px solid #ddd;border-radius:10px;padding:.8rem 1rem;margin-bottom:1rem;font-family:sans-serif}
+.sig-legend{display:flex;justify-content:space-between;font-size:12px;font-weight:600;margin-bottom:4px}
+.sig-gauge{position:relative;height:22px;border-radius:6px;background:linear-gradient(90deg,rgba(255,0,0,.3) 0 60%,rgba(255,255,0,.3) 60% 90%,rgba(0,128,0,.3) 90% 100%)}
+.sig-marker{position:absolute;top:-3px;bottom:-3px;width:4px;margin-left:-2px;background:#000;border-radius:2px}
+.sig-value{position:absolute;top:24px;transform:translateX(-50%);font-size:11px}
+.sig-head{display:flex;align-items:center;gap:.6rem;margin-top:1.6rem}
+.sig-head img{width:40px;height:40px}
+.sig-name{font-size:24px;font-weight:700;line-height:1.1}
+.sig-symbol{font-size:18px;font-weight:600;color:gray}
+.sig-card ul{padding-left:20px;margin:.2rem 0 .6rem}
+.sig-card p{margin:.4rem 0}
+</style>
+"""
+
+GAUGE_TEMPLATE = (
+    "<div class='sig-legend'><span style='color:red'>❌ Weak</span>"
+    "<span style='color:orange'>⚠️ Moderate</span><span style='color:green'>✅ Strong</span></div>"
+    "<div class='sig-gauge'><div class='sig-marker' style='left:{pos:.1f}%'></div>"
+    "<div class='sig-value' style='left:{pos:.1f}%'>{score:.1f}</div></div>"
+)
+
+def score_gauge_html(score):
+    return GAUGE_TEMPLATE.format(pos=max(0.0, min(100.0, score)), score=score)
+
+def signal_card_html(sig, new=False):
+    subscores = "".join(
+        f"<li><strong>{k}:</strong> {int(v) if v is not None else 'N/A'}</li>"
+        for k, v in sig["subscores"].items()
+    )
+    return (
+        f"<div class='sig-card'>{score_gauge_html(sig['buy_score'])}"
+        f"<div class='sig-head'><img src='{html.escape(sig['image'] or '')}' onerror=\"this.style.display='none'\"/>"
+        f"<div><div class='sig-name'>{html.escape(sig['name'])}{' 🆕' if new else ''}</div>"
+        f"<div class='sig-symbol'>{html.escape(sig['symbol'])}</div></div></div>"
+        f"<p><strong>Buy Score:</strong> {sig['buy_score']:.1f}</p>"
+        f"<p><strong>Current Price:</strong> {fmt(sig['price'])}</p>"
+        f"<p><strong>Buy Range:</strong> {fmt(sig['buy_range'][0])} – {fmt(sig['buy_range'][1])}</p>"
+        + (f"<p><strong>vs BTC:</strong> β {sig['btc_beta']:.2f}, ρ {sig['btc_corr']:.2f}</p>"
+           if sig.get("btc_beta") is not None and sig.get("btc_corr") is not None else "")
+        + f"<p><strong>📊 Subscores:</strong></p><ul>{subscores}</ul>"
+        f"<p><strong>🧠 Analysis:</strong></p><p>{html.escape(sig['analysis'])}</p></div>"
+    )
+
+# (mode, coin_id, btc_beta, btc_corr) -> (scan_id the markup is current for, markup); shared
+# by all sessions
+_card_cache = {}
+
+def cached_card_html(sig, mode, changes):
+    # changes: SignalStore.diff of the snapshot being shown. Cards of coins that did not
+    # change since changes["previous_id"] reuse the markup built for that scan. The diff
+    # does not compare the BTC beta and correlation, so they are part of the key.
+    key = (mode, sig["id"], sig.get("btc_beta"), sig.get("btc_corr"))
+    scan_id = changes["scan_id"]
+    cached = _card_cache.get(key)
+    if (cached is not None and cached[0] == changes["previous_id"]
+            and sig["id"] not in changes["changed"] and sig["id"] not in changes["entered"]):
+        _card_cache[key] = (scan_id, cached[1])
+        return cached[1]
+    if cached is not None and cached[0] == scan_id:
+        return cached[1]
+    markup = signal_card_html(sig, new=sig["id"] in changes["entered"] and changes["previous_id"] is not None)
+    if len(_card_cache) > 1000:
+        _card_cache.clear()
+    _card_cache[key] = (scan_id, markup)
+    return markup
+
+def render_signal_cards(signals, columns, mode=None, changes=None):
+    # One markdown call per column instead of ~12 widgets and two Plotly charts per card
+    st.markdown(CARD_STYLE, unsafe_allow_html=True)
+    for i, column in enumerate(columns):
+        cards = [cached_card_html(sig, mode, changes) if changes else signal_card_html(sig)
+                 for sig in signals[i::len(columns)]]
+        if cards:
+            column.markdown("".join(cards), unsafe_allow_html=True)
@@ -0,0 +1,152 @@
+# event_server.py
+#
+#   curl -N http://127.0.0.1:8765/events?mode=light
+#
+# Pushes signal events to subscribers as Server-Sent Events while the scanner scores coins.
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from config import BUY_THRESHOLD
+from metrics import metrics
+
+# Smallest buy_score move reported as score_changed
+MIN_SCORE_DELTA = 1.0
+# Events buffered per client before the oldest are dropped; the next batch reports the count
+CLIENT_QUEUE_SIZE = 1000
+# After the first pending event, wait this long to send more in the same batch
+BATCH_WINDOW_SECONDS = 0.05
+HEARTBEAT_SECONDS = 15
+
+class SignalEventTracker:
+    # Turns signal records into events by comparing each coin with its last seen score
+    def __init__(self, threshold=BUY_THRESHOLD, min_delta=MIN_SCORE_DELTA):
+        self.threshold = threshold
+        self.min_delta = min_delta
+        self.last = {}
+
+    def update(self, mode, sig):
+        key = (mode, sig["id"])
+        score = sig["buy_score"]
+        previous = self.last.get(key)
+        self.last[key] = score
+        base = {"mode": mode, "id": sig["id"], "symbol": sig["symbol"], "buy_score": score,
+                "previous_score": previous, "price": sig["price"], "buy_range": list(sig["buy_range"]),
+                # A copy: the scan thread adds Decoupling to the signal's dict after this event
+                # is queued, while a handler thread may be serializing it
+                "subscores": dict(sig["subscores"]), "time": time.time()}
+        if previous is None:
+            return [dict(base, type="crossed_above")] if score >= self.threshold else []
+        if previous < self.threshold <= score:
+            return [dict(base, type="crossed_above")]
+        if score < self.threshold <= previous:
+            return [dict(base, type="crossed_below")]
+        # Partial (early-stopped) scores are only known to be below the threshold
+        if not sig.get("partial") and abs(score - previous) >= self.min_delta:
+            return [dict(base, type="score_changed")]
+        return []
+
+class _Subscriber:
+    def __init__(self, modes, size):
+        self.modes = modes
+        self.queue = deque(maxlen=size)
+        self.dropped = 0
+        self.ready = threading.Condition()
+
+    def offer(self, events):
+        with self.ready:
+            for event in events:
+                if self.modes and event["mode"] not in self.modes:
+                    continue
+                if len(self.queue) == self.queue.maxlen:
+                    self.dropped += 1
+                self.queue.append(event)
+            self.ready.notify()
+
+    def take(self, timeout):
+        # Blocks until events arrive (or timeout), then gathers for BATCH_WINDOW_SECONDS more
+        with self.ready:
+            if not self.queue:
+                self.ready.wait(timeout)
+            if not self.queue:
+                return [], 0
+        time.sleep(BATCH_WINDOW_SECONDS)
+        with self.ready:
+            batch = list(self.queue)
+            self.queue.clear()
+            dropped, self.dropped = self.dropped, 0
+        return batch, dropped
+
+class EventHub:
+    # publish() never blocks the scanner: each client has a bounded queue, and a client that
+    # cannot keep up loses its oldest events instead of slowing anyone else down
+    def __init__(self, queue_size=CLIENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, modes=None):
+        sub = _Subscriber(set(modes or ()), self.queue_size)
+        with self._lock:
+            self._subscribers.add(sub)
+        metrics.set_gauge("events.subscribers", len(self._subscribers))
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+        metrics.set_gauge("events.subscribers", len(self._subscribers))
+
+    def publish(self, events):
+        if not events:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub.offer(events)
+        metrics.incr("events.published", len(events))
+
+def serve_events(port, hub, host="127.0.0.1"):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.rstrip("/") != "/events":
+                self.send_error(404)
+                return
+            modes = parse_qs(url.query).get("mode")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "keep-alive")
+            self.end_headers()
+            sub = hub.subscribe(modes)
+            try:
+                self.wfile.write(b": connected\n\n")
+                self.wfile.flush()
+                while True:
+                    batch, dropped = sub.take(HEARTBEAT_SECONDS)
+                    if not batch:
+                        self.wfile.write(b": keepalive\n\n")
+                    else:
+                        payload = json.dumps({"events": batch, "dropped": dropped})
+                        self.wfile.write(f"event: signals\ndata: {payload}\n\n".encode())
+                        if dropped:
+                            metrics.incr("events.dropped", dropped)
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                hub.unsubscribe(sub)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -1,65 +1,217 @@
 import pandas as pd
-import streamlit as st
-HEADERS = {"x-cg-pro-api-key": st.secrets["general"]["COINGECKO_API_KEY"]}
-
-import streamlit as st
 
 # fetcher.py
 
-import requests
-from config import COINGECKO_API_BASE, TOP_N_COINS
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import TOP_N_COINS, MAX_CONCURRENT_FETCHES, CANDLE_STORE_PATH
+from candle_series import CandleSeries
+from candle_store import CandleStore
+from http_client import get_json, circuit_open, rate_limiter
+from metrics import metrics
+from resample import resample
+from resilience import CircuitOpenError
 from utils import log_resolution
 
-def get_top_gainers(period="1h"):
-    url = f"{COINGECKO_API_BASE}/coins/markets"
+candle_store = None
+
+def get_candle_store():
+    # Opened on first use so importing the fetcher creates no database
+    global candle_store
+    if candle_store is None:
+        candle_store = CandleStore(CANDLE_STORE_PATH)
+    return candle_store
+
+def get_top_gainers(period="1h", size=TOP_N_COINS):
+    # /coins/markets cannot sort by price change, so rank the fetched universe locally
+    universe = get_market_universe(size)
+    column = f"price_change_percentage_{period}_in_currency"
+    return universe.sort_values(column, ascending=False, na_position="last", kind="stable")["id"].tolist()
+
+def get_market_coins(per_page=TOP_N_COINS, page=1):
     params = {
         "vs_currency": "usd",
-        "order": "percent_change_1h_desc" if period == "1h" else "percent_change_4h_desc",
-        "per_page": TOP_N_COINS,
-        "page": 1,
-        "price_change_percentage": "1h,4h"
+        "order": "market_cap_desc",
+        "per_page": per_page,
+        "page": page,
+        "sparkline": "false",
+        "price_change_percentage": "1h,24h,7d"
     }
-    response = requests.get(url, params=params, headers=HEADERS)
-    response.raise_for_status()
-    return [coin["id"] for coin in response.json()]
+    return get_json("/coins/markets", params)
+
+# CoinGecko caps /coins/markets at 250 rows per page
+MARKETS_PAGE_SIZE = 250
+# Last successfully fetched universe per size, served while /coins/markets is failing
+_last_universe = {}
+UNIVERSE_COLUMNS = [
+    "id", "symbol", "name", "image", "current_price",
+    "price_change_percentage_1h_in_currency", "price_change_percentage_24h_in_currency",
+    "price_change_percentage_7d_in_currency", "total_volume", "market_cap", "market_cap_rank",
+    "high_24h", "low_24h",
+]
+
+def get_market_universe(size=TOP_N_COINS, max_workers=MAX_CONCURRENT_FETCHES, limiter=None):
+    # The top `size` coins by market cap as one columnar table, fetched in
+    # ceil(size / 250) concurrent page requests and deduplicated on id
+    limiter = limiter or rate_limiter
+    pages = max(1, -(-size // MARKETS_PAGE_SIZE))
+    per_page = min(size, MARKETS_PAGE_SIZE)
+
+    def fetch(page):
+        limiter.acquire()
+        return page, get_market_coins(per_page=per_page, page=page)
+
+    with metrics.timer("fetch.universe"):
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, pages))) as pool:
+                results = dict(pool.map(fetch, range(1, pages + 1)))
+        except Exception as e:
+            # Rescan the last list fetched rather than failing the whole scan
+            if size not in _last_universe:
+                raise
+            log_resolution("markets", "Market list", f"Failed: {e}; reusing the previous list")
+            metrics.incr("fetch.universe_fallback")
+            return _last_universe[size]
+        rows = [row for page in sorted(results) for row in results[page]]
+        universe = pd.DataFrame.from_records(rows, columns=UNIVERSE_COLUMNS)
+        # Rankings shift between page requests, so a coin can show up on two pages
+        universe = universe.drop_duplicates("id", keep="first").head(size).reset_index(drop=True)
+    metrics.set_gauge("universe.coins", len(universe))
+    _last_universe[size] = universe
+    return universe
 
-def get_ohlc_data(coin_id, days=1):
-    try:
-        url = f"{COINGECKO_API_BASE}/coins/{coin_id}/ohlc"
-        params = {"vs_currency": "usd", "days": days}
-        response = requests.get(url, params=params, headers=HEADERS)
-        response.raise_for_status()
-        log_resolution(coin_id, "Higher Accuracy (Hourly Data)", "Success")
-        return response.json()
-    except Exception as e:
-        log_resolution(coin_id, "Higher Accuracy (Hourly Data)", f"Failed: {e}")
-        # Placeholder: Add fallback to daily data here
-        return []
 def get_ohlc_data(coin_id, use_market_chart=False, vs_currency="usd", days="1"):
+    series = get_ohlc_series(coin_id, use_market_chart=use_market_chart, vs_currency=vs_currency, days=days)
+    return pd.DataFrame() if series.empty else series.to_frame()
+
+def get_ohlc_series(coin_id, use_market_chart=False, vs_currency="usd", days="1"):
+    try:
+        return _fetch_series(coin_id, use_market_chart, vs_currency, days)
+    except Exception:
+        return CandleSeries.empty_series()
+
+def _granularity_path(use_market_chart):
+    return "market_chart" if use_market_chart else "ohlc"
+
+def _fetch_series(coin_id, use_market_chart, vs_currency, days):
+    params = {"vs_currency": vs_currency, "days": days}
+    payload = get_json(f"/coins/{coin_id}/{_granularity_path(use_market_chart)}", params)
     if use_market_chart:
-        url = f"{COINGECKO_API_BASE}/coins/{coin_id}/market_chart"
-        params = {"vs_currency": vs_currency, "days": days}
+        return CandleSeries.from_market_chart_payload(payload)
+    return CandleSeries.from_ohlc_payload(payload)
+
+def _granularity(use_market_chart):
+    return "5m" if use_market_chart else "30m"
+
+def is_cached(coin_id, use_market_chart=False, vs_currency="usd", store=None):
+    # True when get_ohlc_data_cached would be served from the candle store without an API call
+    store = store or get_candle_store()
+    return store.is_fresh(coin_id, vs_currency, _granularity(use_market_chart), int(time.time() * 1000))
+
+def get_ohlc_data_cached(coin_id, use_market_chart=False, vs_currency="usd", days="1", store=None, limiter=None,
+                         as_series=False, offline=False):
+    # as_series=True returns a CandleSeries (what the scan loop scores) instead of a DataFrame;
+    # offline=True serves whatever the candle store holds, however old, and never calls the API
+    with metrics.timer("fetch.ohlc"):
+        return _get_ohlc_data_cached(coin_id, use_market_chart, vs_currency, days, store or get_candle_store(),
+                                     limiter, as_series, offline)
+
+def _get_ohlc_data_cached(coin_id, use_market_chart, vs_currency, days, store, limiter, as_series, offline):
+    granularity = _granularity(use_market_chart)
+    now_ms = int(time.time() * 1000)
+    window_start = now_ms - int(float(days) * 86400 * 1000)
+
+    if offline:
+        metrics.incr("candle_store.deferred")
+        return store.load(coin_id, vs_currency, granularity, since_ms=window_start, as_series=as_series)
+    if store.is_fresh(coin_id, vs_currency, granularity, now_ms):
+        metrics.incr("candle_store.hit")
+        return store.load(coin_id, vs_currency, granularity, since_ms=window_start, as_series=as_series)
+    metrics.incr("candle_store.miss")
+
+    last = store.last_timestamp(coin_id, vs_currency, granularity)
+    incremental = use_market_chart and last is not None and last >= window_start
+    path = f"/coins/{coin_id}/" + ("market_chart/range" if incremental else _granularity_path(use_market_chart))
+    try:
+        if circuit_open(path):
+            raise CircuitOpenError(path)
+        if limiter:
+            limiter.acquire()
+        if incremental:
+            candles = _fetch_market_chart_range(coin_id, last // 1000, now_ms // 1000, vs_currency)
+        else:
+            candles = _fetch_series(coin_id, use_market_chart, vs_currency, days)
+    except Exception as e:
+        return _fallback_candles(coin_id, use_market_chart, vs_currency, days, store, limiter, window_start,
+                                 as_series, e)
+    store.merge(coin_id, vs_currency, granularity, candles)
+    return store.load(coin_id, vs_currency, granularity, since_ms=window_start, as_series=as_series)
+
+def _fallback_candles(coin_id, use_market_chart, vs_currency, days, store, limiter, window_start, as_series, error):
+    # The request failed after retries, timed out or was short-circuited by an open circuit.
+    # Serve the stored candles however stale; with none stored, 5-minute requests fall back
+    # to the 30-minute /ohlc endpoint, which has its own circuit.
+    metrics.incr("fetch.fallback")
+    granularity = _granularity(use_market_chart)
+    stored = store.load(coin_id, vs_currency, granularity, since_ms=window_start, as_series=True)
+    if stored.empty and use_market_chart and not circuit_open(f"/coins/{coin_id}/ohlc"):
         try:
-            response = requests.get(url, params=params, headers=HEADERS, timeout=5)
-            response.raise_for_status()
-            prices = response.json().get("prices", [])
-            volumes = response.json().get("total_volumes", [])
-            df = pd.DataFrame(prices, columns=["timestamp", "price"])
-            df["volume"] = [v[1] for v in volumes]
-            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-            df["open"] = df["high"] = df["low"] = df["close"] = df["price"]
-            return df[["timestamp", "open", "high", "low", "close", "volume"]]
-        except:
-            return pd.DataFrame()
+            if limiter:
+                limiter.acquire()
+            coarse = _fetch_series(coin_id, False, vs_currency, days)
+            store.merge(coin_id, vs_currency, _granularity(False), coarse)
+            log_resolution(coin_id, "Fallback (30m OHLC)", "Success")
+            metrics.incr("fetch.fallback_coarse")
+        except Exception:
+            pass
+        stored = store.load(coin_id, vs_currency, _granularity(False), since_ms=window_start, as_series=True)
+    if stored.empty:
+        log_resolution(coin_id, f"Primary ({granularity})", f"Failed: {error}")
     else:
-        url = f"{COINGECKO_API_BASE}/coins/{coin_id}/ohlc"
-        params = {"vs_currency": vs_currency, "days": days}
-        try:
-            response = requests.get(url, params=params, headers=HEADERS, timeout=5)
-            response.raise_for_status()
-            ohlc = response.json()
-            df = pd.DataFrame(ohlc, columns=["timestamp", "open", "high", "low", "close"])
-            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-            return df
-        except:
-            return pd.DataFrame()
+        metrics.incr("fetch.fallback_served")
+    if as_series:
+        return stored
+    return pd.DataFrame() if stored.empty else stored.to_frame()
+
+# Every timeframe is resampled locally from one stored 5-minute market_chart series, so
+# switching scan modes or scoring several timeframes costs no extra requests
+FINEST_TIMEFRAME = "5m"
+MODE_TIMEFRAMES = {"light": "30m", "full": "5m"}
+
+def mode_timeframe(use_market_chart):
+    return MODE_TIMEFRAMES["full" if use_market_chart else "light"]
+
+def get_candles(coin_id, timeframe=FINEST_TIMEFRAME, vs_currency="usd", days="1", store=None, limiter=None,
+                offline=False):
+    finest = get_ohlc_data_cached(coin_id, use_market_chart=True, vs_currency=vs_currency, days=days, store=store,
+                                  limiter=limiter, as_series=True, offline=offline)
+    return resample(finest, timeframe)
+
+def _fetch_market_chart_range(coin_id, from_s, to_s, vs_currency):
+    params = {"vs_currency": vs_currency, "from": from_s, "to": to_s}
+    return CandleSeries.from_market_chart_payload(get_json(f"/coins/{coin_id}/market_chart/range", params))
+
+def fetch_ohlc_concurrently(coin_ids, use_market_chart=False, max_workers=MAX_CONCURRENT_FETCHES, limiter=None,
+                            as_series=False, offline_ids=(), timeframe=None):
+    # Yields (coin_id, candles) pairs in completion order, not input order. Coins in
+    # offline_ids are served from the candle store only. With a timeframe, candles are
+    # CandleSeries resampled from the shared 5-minute series and use_market_chart is ignored.
+    limiter = limiter or rate_limiter
+    offline_ids = set(offline_ids)
+
+    def fetch(coin_id):
+        # The limiter is only charged when the candle store cannot serve the coin locally
+        if timeframe:
+            return coin_id, get_candles(coin_id, timeframe, limiter=limiter, offline=coin_id in offline_ids)
+        return coin_id, get_ohlc_data_cached(coin_id, use_market_chart=use_market_chart, limiter=limiter,
+                                             as_series=as_series, offline=coin_id in offline_ids)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    futures = [pool.submit(fetch, coin_id) for coin_id in coin_ids]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=False)
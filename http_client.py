@@ -0,0 +1,74 @@
+# http_client.py
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from config import (COINGECKO_API_BASE, HEADERS, MAX_CONNECTIONS_PER_HOST, COALESCE_WINDOW_SECONDS,
+                    COINGECKO_RATE_LIMIT_PER_MIN)
+from metrics import metrics
+from rate_limiter import TokenBucket
+from resilience import ResilientCaller
+from single_flight import SingleFlight
+
+DEFAULT_TIMEOUT = 5
+
+_session = None
+_session_lock = threading.Lock()
+_flights = SingleFlight(COALESCE_WINDOW_SECONDS)
+# Shared by every caller in the process so concurrent scans stay inside the plan quota;
+# callers acquire it per request and resilience charges it for hedges and retries
+rate_limiter = TokenBucket(COINGECKO_RATE_LIMIT_PER_MIN)
+resilience = ResilientCaller(limiter=rate_limiter)
+
+def get_session():
+    # One keep-alive session per process; pool_block caps open connections per host
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONNECTIONS_PER_HOST, pool_block=True)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(HEADERS)
+                session.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip, deflate"})
+                _session = session
+    return _session
+
+def endpoint_name(path):
+    # "/coins/bitcoin/ohlc" -> "coins/{id}/ohlc" so latencies aggregate per endpoint, not per coin
+    parts = path.strip("/").split("/")
+    if len(parts) >= 2 and parts[0] == "coins" and parts[1] != "markets":
+        parts[1] = "{id}"
+    return "/".join(parts)
+
+def request_key(path, params=None):
+    return path, tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+
+def get_json(path, params=None, timeout=DEFAULT_TIMEOUT):
+    # Every caller asking for the same (path, params) within COALESCE_WINDOW_SECONDS gets
+    # the one parsed response; do not mutate it. Raises CircuitOpenError without a request
+    # while the endpoint's circuit is open.
+    endpoint = endpoint_name(path)
+    return _flights.do(request_key(path, params),
+                       lambda: resilience.call(endpoint, lambda: _fetch_json(path, params, timeout)))
+
+def circuit_open(path):
+    # Lets callers skip rate-limiter waits for a request that would be short-circuited anyway
+    return resilience.is_open(endpoint_name(path))
+
+def new_cycle():
+    # From the first call on, identical requests share one response until the next cycle
+    # rather than for COALESCE_WINDOW_SECONDS, so every mode of a scanner cycle reuses them
+    _flights.forget()
+
+def _fetch_json(path, params, timeout):
+    metrics.incr("api.calls")
+    try:
+        with metrics.timer(f"http.{endpoint_name(path)}"):
+            response = get_session().get(f"{COINGECKO_API_BASE}{path}", params=params, timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+    except Exception:
+        metrics.incr("api.errors")
+        raise
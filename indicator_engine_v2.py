@@ -1,18 +1,128 @@
-
-import pandas as pd
 import numpy as np
-import ta
+from collections import Counter
+import indicator_kernels as K
+from candle_series import CandleSeries
+from metrics import metrics
+
+INDICATOR_WEIGHTS = {
+    'RSI': 0.25,
+    'MACD': 0.25,
+    'EMA': 0.20,
+    'Volume': 0.15,
+    'StochRSI': 0.10,
+    'ADX': 0.05
+}
+
+def weighted_score(scores, weights=INDICATOR_WEIGHTS):
+    total = 0
+    weight_total = 0
+    for k, w in weights.items():
+        if scores.get(k) is not None:
+            total += scores[k] * w
+            weight_total += w
+    return round(total / weight_total, 2) if weight_total > 0 else 0.0
 
 class IndicatorEngineV2:
-    def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
-        self.df.dropna(inplace=True)
+    # Intermediate series and the series they are built from. Each one is computed
+    # at most once per engine and shared by every indicator that needs it.
+    GRAPH = {
+        'gains_losses': ('close',),
+        'avg_gain': ('gains_losses',),
+        'avg_loss': ('gains_losses',),
+        'rsi': ('avg_gain', 'avg_loss'),
+        'stoch_rsi_k': ('rsi',),
+        'ema_12': ('close',),
+        'ema_26': ('close',),
+        'ema_50': ('close',),
+        'macd': ('ema_12', 'ema_26'),
+        'macd_signal': ('macd',),
+        'volume_avg_20': ('volume',),
+        'true_range': ('high', 'low', 'close'),
+        'adx': ('high', 'low', 'close', 'true_range'),
+    }
+
+    # Lazy evaluation order: cheapest indicators and those with the most weight per unit of
+    # work first; StochRSI comes after RSI so it reuses the cached RSI series
+    LAZY_ORDER = ['Volume', 'EMA', 'RSI', 'StochRSI', 'MACD', 'ADX']
+    CALCULATORS = {
+        'RSI': 'calculate_rsi',
+        'MACD': 'calculate_macd',
+        'EMA': 'calculate_ema_trend',
+        'Volume': 'calculate_volume_spike',
+        'StochRSI': 'calculate_stoch_rsi',
+        'ADX': 'calculate_adx',
+    }
+
+    def __init__(self, candles):
+        # A CandleSeries is used as-is; an OHLC(V) DataFrame is converted to one once
+        if not isinstance(candles, CandleSeries):
+            candles = CandleSeries.from_frame(candles)
+        self.candles = candles.dropna()
         self.scores = {}
+        self._cache = {}
+        self.cache_hits = Counter()
+        self.cache_misses = Counter()
+        self.stopped_early = False
+
+    def _series(self, name):
+        if name in self._cache:
+            self.cache_hits[name] += 1
+            return self._cache[name]
+        self.cache_misses[name] += 1
+        if name in self.GRAPH:
+            inputs = [self._series(dep) for dep in self.GRAPH[name]]
+            value = getattr(self, f"_build_{name}")(*inputs)
+        else:
+            value = np.asarray(self.candles.column(name), dtype=np.float64)[None, :]
+        self._cache[name] = value
+        return value
+
+    def _build_gains_losses(self, close):
+        return K.gains_losses(close)
+
+    def _build_avg_gain(self, gains_losses):
+        return K.wilder_average(gains_losses[0], 14)
+
+    def _build_avg_loss(self, gains_losses):
+        return K.wilder_average(gains_losses[1], 14)
+
+    def _build_rsi(self, avg_gain, avg_loss):
+        return K.rsi_from_averages(avg_gain, avg_loss)
+
+    def _build_stoch_rsi_k(self, rsi):
+        return K.stoch_rsi_k(rsi)
+
+    def _build_ema_12(self, close):
+        return K.ema(close, 12)
+
+    def _build_ema_26(self, close):
+        return K.ema(close, 26)
+
+    def _build_ema_50(self, close):
+        return K.ema(close, 50)
+
+    def _build_macd(self, ema_12, ema_26):
+        return ema_12 - ema_26
+
+    def _build_macd_signal(self, macd):
+        return K.ema(macd, 9)
+
+    def _build_volume_avg_20(self, volume):
+        return K.rolling_mean(volume, 20)
+
+    def _build_true_range(self, high, low, close):
+        return K.true_range(high, low, close)
+
+    def _build_adx(self, high, low, close, true_range):
+        return K.adx(high, low, close, tr=true_range)
+
+    def cache_report(self):
+        return {'hits': dict(self.cache_hits), 'misses': dict(self.cache_misses)}
 
     def calculate_rsi(self):
         try:
-            rsi = ta.momentum.RSIIndicator(close=self.df['close'], window=14).rsi()
-            latest_rsi = rsi.dropna().iloc[-1]
+            rsi = self._series('rsi')[0]
+            latest_rsi = rsi[~np.isnan(rsi)][-1]
             score = max(0, min(100, (70 - latest_rsi) * (100 / 40)))
             return round(score, 2)
         except:
@@ -20,10 +130,9 @@ class IndicatorEngineV2:
 
     def calculate_macd(self):
         try:
-            macd = ta.trend.MACD(close=self.df['close'])
-            macd_line = macd.macd()
-            signal_line = macd.macd_signal()
-            if macd_line.iloc[-2] < signal_line.iloc[-2] and macd_line.iloc[-1] > signal_line.iloc[-1]:
+            macd_line = self._series('macd')[0]
+            signal_line = self._series('macd_signal')[0]
+            if macd_line[-2] < signal_line[-2] and macd_line[-1] > signal_line[-1]:
                 return 100
             else:
                 return 30
@@ -32,8 +141,8 @@ class IndicatorEngineV2:
 
     def calculate_ema_trend(self):
         try:
-            ema = ta.trend.EMAIndicator(close=self.df['close'], window=50).ema_indicator()
-            if self.df['close'].iloc[-1] > ema.iloc[-1]:
+            ema = self._series('ema_50')[0]
+            if self.candles.close[-1] > ema[-1]:
                 return 100
             else:
                 return 30
@@ -42,13 +151,17 @@ class IndicatorEngineV2:
 
     def calculate_volume_spike(self):
         try:
-            if 'volume' not in self.df.columns:
+            if self.candles.volume is None:
                 return None
-            avg_vol = self.df['volume'].rolling(window=20).mean()
-            current_vol = self.df['volume'].iloc[-1]
-            if current_vol > avg_vol.iloc[-1] * 1.3:
+            # A still forming last candle is left out; the spike is read at the last closed one
+            last = len(self.candles) - 1 - self.candles.forming
+            if last < 0:
+                return None
+            avg_vol = self._series('volume_avg_20')[0]
+            current_vol = self.candles.volume[last]
+            if current_vol > avg_vol[last] * 1.3:
                 return 100
-            elif current_vol > avg_vol.iloc[-1]:
+            elif current_vol > avg_vol[last]:
                 return 60
             else:
                 return 30
@@ -57,8 +170,8 @@ class IndicatorEngineV2:
 
     def calculate_stoch_rsi(self):
         try:
-            stoch_rsi = ta.momentum.StochRSIIndicator(close=self.df['close']).stochrsi_k()
-            if stoch_rsi.iloc[-2] < 0.2 and stoch_rsi.iloc[-1] > 0.2:
+            stoch_rsi = self._series('stoch_rsi_k')[0]
+            if stoch_rsi[-2] < 0.2 and stoch_rsi[-1] > 0.2:
                 return 100
             else:
                 return 30
@@ -67,8 +180,10 @@ class IndicatorEngineV2:
 
     def calculate_adx(self):
         try:
-            adx = ta.trend.ADXIndicator(high=self.df['high'], low=self.df['low'], close=self.df['close']).adx()
-            latest_adx = adx.iloc[-1]
+            latest_adx = self._series('adx')[0][-1]
+            # ta raised on histories too short to seed ADX; the kernel leaves them NaN
+            if np.isnan(latest_adx):
+                return None
             if latest_adx > 25:
                 return 100
             elif latest_adx > 20:
@@ -78,28 +193,47 @@ class IndicatorEngineV2:
         except:
             return None
 
-    def calculate_all(self):
-        self.scores['RSI'] = self.calculate_rsi()
-        self.scores['MACD'] = self.calculate_macd()
-        self.scores['EMA'] = self.calculate_ema_trend()
-        self.scores['Volume'] = self.calculate_volume_spike()
-        self.scores['StochRSI'] = self.calculate_stoch_rsi()
-        self.scores['ADX'] = self.calculate_adx()
+    def calculate_all(self, lazy=False, threshold=60):
+        # lazy=True stops once the weighted score provably cannot reach threshold; the
+        # indicators left unevaluated are None and stopped_early is set, so the weighted
+        # score is then only known to be below threshold
+        self.cache_hits.clear()
+        self.cache_misses.clear()
+        self.stopped_early = False
+        with metrics.timer("indicators.calculate_all"):
+            if lazy:
+                self._calculate_lazy(threshold)
+            else:
+                self.scores['RSI'] = self.calculate_rsi()
+                self.scores['MACD'] = self.calculate_macd()
+                self.scores['EMA'] = self.calculate_ema_trend()
+                self.scores['Volume'] = self.calculate_volume_spike()
+                self.scores['StochRSI'] = self.calculate_stoch_rsi()
+                self.scores['ADX'] = self.calculate_adx()
+        metrics.incr("indicator_cache.hit", sum(self.cache_hits.values()))
+        metrics.incr("indicator_cache.miss", sum(self.cache_misses.values()))
         return self.scores
 
-    def calculate_weighted_score(self):
-        weights = {
-            'RSI': 0.25,
-            'MACD': 0.25,
-            'EMA': 0.20,
-            'Volume': 0.15,
-            'StochRSI': 0.10,
-            'ADX': 0.05
-        }
+    def _calculate_lazy(self, threshold, weights=INDICATOR_WEIGHTS):
+        self.scores = dict.fromkeys(weights)
         total = 0
         weight_total = 0
-        for k, w in weights.items():
-            if self.scores.get(k) is not None:
-                total += self.scores[k] * w
-                weight_total += w
-        return round(total / weight_total, 2) if weight_total > 0 else 0.0
+        remaining = sum(weights.values())
+        for name in self.LAZY_ORDER:
+            score = getattr(self, self.CALCULATORS[name])()
+            self.scores[name] = score
+            remaining -= weights[name]
+            if score is not None:
+                total += score * weights[name]
+                weight_total += weights[name]
+            # Best case: every remaining indicator scores 100 (a missing one only lowers the average)
+            if weight_total + remaining <= 0:
+                break
+            bound = (total + 100 * remaining) / (weight_total + remaining)
+            if remaining > 1e-12 and bound < threshold - 0.01:
+                self.stopped_early = True
+                metrics.incr("indicators.early_stop")
+                break
+
+    def calculate_weighted_score(self):
+        return weighted_score(self.scores)
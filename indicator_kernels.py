@@ -0,0 +1,155 @@
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# NumPy versions of the ta indicators used by IndicatorEngineV2.
+# Every function takes 2-D float64 arrays shaped (coins, candles), right-aligned so the
+# newest candle is the last column and shorter histories are NaN-padded on the left.
+# Column t of each result is the value the ta indicator would report if the history
+# ended at candle t, and the recursions follow pandas/ta operation order so values match.
+
+def com_from_span(span):
+    return (span - 1) / 2.0
+
+def com_from_alpha(alpha):
+    return (1.0 - alpha) / alpha
+
+def first_valid_index(x):
+    valid = ~np.isnan(x)
+    start = np.argmax(valid, axis=1)
+    start[~valid.any(axis=1)] = x.shape[1]
+    return start
+
+def shift(x, periods=1):
+    out = np.full_like(x, np.nan)
+    out[:, periods:] = x[:, :-periods]
+    return out
+
+def ewm_mean(x, com, min_periods):
+    # pandas' ewm(adjust=False) recursion, run column-wise over the transposed panel
+    frame = pd.DataFrame(x.T, copy=False)
+    return frame.ewm(com=com, min_periods=min_periods, adjust=False).mean().to_numpy().T
+
+def ema(x, span):
+    return ewm_mean(x, com_from_span(span), span)
+
+def rolling_mean(x, window):
+    # Summed oldest-to-newest so a running window can reproduce it bit for bit
+    rows, n = x.shape
+    out = np.full_like(x, np.nan)
+    if n >= window:
+        width = n - window + 1
+        acc = x[:, 0:width].copy()
+        for k in range(1, window):
+            acc = acc + x[:, k:k + width]
+        out[:, window - 1:] = acc / window
+    return out
+
+def rolling_min(x, window):
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = sliding_window_view(x, window, axis=1).min(axis=-1)
+    return out
+
+def rolling_max(x, window):
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= window:
+        out[:, window - 1:] = sliding_window_view(x, window, axis=1).max(axis=-1)
+    return out
+
+def gains_losses(close):
+    diff = close - shift(close)
+    padded = np.isnan(close)
+    with np.errstate(invalid="ignore"):
+        gains = np.where(diff > 0, diff, 0.0)
+        losses = -np.where(diff < 0, diff, 0.0)
+    gains[padded] = np.nan
+    losses[padded] = np.nan
+    return gains, losses
+
+def wilder_average(x, window=14):
+    return ewm_mean(x, com_from_alpha(1 / window), window)
+
+def rsi_from_averages(avg_gain, avg_loss):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(avg_loss == 0, 100, 100 - (100 / (1 + avg_gain / avg_loss)))
+
+def rsi(close, window=14):
+    gains, losses = gains_losses(close)
+    return rsi_from_averages(wilder_average(gains, window), wilder_average(losses, window))
+
+def stoch_rsi_k(rsi_values, window=14, smooth=3):
+    lowest = rolling_min(rsi_values, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stoch = (rsi_values - lowest) / (rolling_max(rsi_values, window) - lowest)
+    return rolling_mean(stoch, smooth)
+
+def macd(close, fast=12, slow=26, signal=9):
+    line = ema(close, fast) - ema(close, slow)
+    return line, ema(line, signal)
+
+def true_range(high, low, close):
+    prev_close = shift(close)
+    return np.maximum(high, prev_close) - np.minimum(low, prev_close)
+
+def directional_movement(high, low):
+    diff_up = high - shift(high)
+    diff_down = shift(low) - low
+    with np.errstate(invalid="ignore"):
+        pos = np.abs(((diff_up > diff_down) & (diff_up > 0)) * diff_up)
+        neg = np.abs(((diff_down > diff_up) & (diff_down > 0)) * diff_down)
+    return pos, neg
+
+def _gather(x, start, offset, count):
+    idx = np.clip(start[:, None] + offset + np.arange(count), 0, x.shape[1] - 1)
+    return np.ascontiguousarray(np.take_along_axis(x, idx, axis=1))
+
+# Below this many coins a plain per-row Python loop beats per-candle NumPy calls
+SCALAR_ROWS = 16
+
+def _recurse(x, start, first, seed, step):
+    # out = seed at candle start + first, then step(prev, x[t]) for every later candle
+    rows, n = x.shape
+    out = np.full_like(x, np.nan)
+    if rows <= SCALAR_ROWS:
+        for row in range(rows):
+            t0 = start[row] + first
+            if t0 >= n:
+                continue
+            values = x[row].tolist()
+            prev = float(seed[row])
+            series = [prev]
+            for t in range(t0 + 1, n):
+                prev = step(prev, values[t])
+                series.append(prev)
+            out[row, t0:] = series
+    else:
+        prev = np.full(rows, np.nan)
+        for t in range(n):
+            prev = np.where(t - start == first, seed, step(prev, x[:, t]))
+            out[:, t] = prev
+    return out
+
+def wilder_sum(x, start, window=14):
+    # ta seeds the smoothed sum with candles 1..window, then decays by 1/window per candle
+    seed = _gather(x, start, 1, window).sum(axis=1)
+    return _recurse(x, start, window, seed, lambda prev, cur: prev - (prev / float(window)) + cur)
+
+def adx(high, low, close, window=14, tr=None):
+    # Replicates ta.trend.ADXIndicator(...).adx(), including its seeding quirks;
+    # NaN until a coin has 2 * window candles, where ta raises instead
+    start = first_valid_index(close)
+    if tr is None:
+        tr = true_range(high, low, close)
+    pos, neg = directional_movement(high, low)
+    trs = wilder_sum(tr, start, window)
+    dip_sum = wilder_sum(pos, start, window)
+    din_sum = wilder_sum(neg, start, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dip = np.where(trs != 0, 100 * (dip_sum / trs), 0)
+        din = np.where(trs != 0, 100 * (din_sum / trs), 0)
+        dx = np.where(dip + din != 0, 100 * np.abs((dip - din) / (dip + din)), 0)
+    seed = _gather(dx, start, window, window).mean(axis=1)
+    return _recurse(dx, start, 2 * window - 1, seed,
+                    lambda prev, cur: ((prev * (window - 1)) + cur) / float(window))
@@ -0,0 +1,230 @@
+# indicator_stream.py
+
+import math
+from collections import deque
+import numpy as np
+from indicator_kernels import com_from_alpha, com_from_span
+from indicator_engine_v2 import weighted_score
+
+# Constant-time, candle-by-candle version of IndicatorEngineV2. Every recursion below
+# follows the same operation order as indicator_kernels, so after the same candles
+# the subscores and weighted score equal a full IndicatorEngineV2 recompute.
+# Appended candles are final: feed closed candles only. A series whose last candle is
+# still forming (CandleSeries.forming, from resample) matches after its closed candles
+# in Volume only, since IndicatorEngineV2 reads Volume at the last closed candle there.
+
+class _Ewm:
+    __slots__ = ("alpha", "old_wt_factor", "min_periods", "weighted", "old_wt", "nobs")
+
+    def __init__(self, com, min_periods):
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - self.alpha
+        self.min_periods = min_periods
+        self.weighted = math.nan
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, cur):
+        # pandas ewm(adjust=False, ignore_na=False) for one new observation
+        observed = not math.isnan(cur)
+        self.nobs += observed
+        if not math.isnan(self.weighted):
+            self.old_wt *= self.old_wt_factor
+            if observed:
+                if self.weighted != cur:
+                    self.weighted = (self.old_wt * self.weighted + self.alpha * cur) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif observed:
+            self.weighted = cur
+        return self.weighted if self.nobs >= self.min_periods else math.nan
+
+class _WilderSum:
+    __slots__ = ("window", "seed", "value")
+
+    def __init__(self, window):
+        self.window = window
+        self.seed = []
+        self.value = math.nan
+
+    def update(self, age, cur):
+        # ta sums candles 1..window as the seed, then decays by 1/window per candle
+        if age == 0:
+            return math.nan
+        if age <= self.window:
+            self.seed.append(cur)
+            if age == self.window:
+                self.value = float(np.array(self.seed).sum())
+            return self.value
+        self.value = self.value - (self.value / float(self.window)) + cur
+        return self.value
+
+class IndicatorStream:
+    def __init__(self, window=14):
+        self.window = window
+        self.count = 0
+        self.prev = None
+        self.has_volume = False
+        self.scores = {}
+
+        self.avg_gain = _Ewm(com_from_alpha(1 / window), window)
+        self.avg_loss = _Ewm(com_from_alpha(1 / window), window)
+        self.latest_rsi = None
+        self.rsi_window = deque(maxlen=window)
+        self.stoch_window = deque(maxlen=3)
+        self.stoch_k = math.nan
+        self.stoch_prev = math.nan
+
+        self.ema_12 = _Ewm(com_from_span(12), 12)
+        self.ema_26 = _Ewm(com_from_span(26), 26)
+        self.ema_50 = _Ewm(com_from_span(50), 50)
+        self.signal = _Ewm(com_from_span(9), 9)
+        self.macd = (math.nan, math.nan)
+        self.macd_prev = (math.nan, math.nan)
+
+        self.volumes = deque(maxlen=20)
+
+        self.trs = _WilderSum(window)
+        self.dip_sum = _WilderSum(window)
+        self.din_sum = _WilderSum(window)
+        self.dx_seed = []
+        self.adx = math.nan
+
+    @classmethod
+    def from_frame(cls, df):
+        stream = cls()
+        for candle in df.dropna().to_dict("records"):
+            stream.update(candle)
+        return stream
+
+    def update(self, candle):
+        high, low, close = float(candle["high"]), float(candle["low"]), float(candle["close"])
+        volume = candle.get("volume")
+        if volume is not None:
+            volume = float(volume)
+        if math.isnan(high) or math.isnan(low) or math.isnan(close) or (volume is not None and math.isnan(volume)):
+            return self.scores
+        age = self.count
+        self.count += 1
+
+        self._update_rsi(close, age)
+        self._update_macd(close)
+        ema_50 = self.ema_50.update(close)
+        self.scores['RSI'] = self._rsi_score()
+        self.scores['MACD'] = self._cross_score(self.macd_prev, self.macd) if age >= 1 else None
+        self.scores['EMA'] = 100 if close > ema_50 else 30
+
+        if volume is not None:
+            self.has_volume = True
+            self.volumes.append(volume)
+        self.scores['Volume'] = self._volume_score(volume) if self.has_volume else None
+
+        self.scores['StochRSI'] = (100 if self.stoch_prev < 0.2 and self.stoch_k > 0.2 else 30) if age >= 1 else None
+
+        self._update_adx(high, low, close, age)
+        self.scores['ADX'] = self._adx_score()
+
+        self.prev = (high, low, close)
+        return self.scores
+
+    def _update_rsi(self, close, age):
+        if age == 0:
+            gain = loss = 0.0
+        else:
+            diff = close - self.prev[2]
+            gain = diff if diff > 0 else 0.0
+            loss = -(diff if diff < 0 else 0.0)
+        avg_gain = self.avg_gain.update(gain)
+        avg_loss = self.avg_loss.update(loss)
+        rsi = np.float64(self._rsi(avg_gain, avg_loss))
+        if not math.isnan(rsi):
+            self.latest_rsi = rsi
+
+        self.rsi_window.append(rsi)
+        stoch = math.nan
+        if len(self.rsi_window) == self.window and not any(math.isnan(v) for v in self.rsi_window):
+            lowest, highest = min(self.rsi_window), max(self.rsi_window)
+            if highest != lowest:
+                stoch = (rsi - lowest) / (highest - lowest)
+        self.stoch_window.append(stoch)
+        self.stoch_prev = self.stoch_k
+        if len(self.stoch_window) == 3:
+            a, b, c = self.stoch_window
+            self.stoch_k = ((a + b) + c) / 3
+        else:
+            self.stoch_k = math.nan
+
+    @staticmethod
+    def _rsi(avg_gain, avg_loss):
+        if math.isnan(avg_loss):
+            return math.nan
+        if avg_loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def _rsi_score(self):
+        if self.latest_rsi is None:
+            return None
+        score = max(0, min(100, (70 - self.latest_rsi) * (100 / 40)))
+        return round(score, 2)
+
+    def _update_macd(self, close):
+        line = self.ema_12.update(close) - self.ema_26.update(close)
+        self.macd_prev = self.macd
+        self.macd = (line, self.signal.update(line))
+
+    @staticmethod
+    def _cross_score(prev, cur):
+        return 100 if prev[0] < prev[1] and cur[0] > cur[1] else 30
+
+    def _volume_score(self, current_vol):
+        if current_vol is None:
+            return None
+        if len(self.volumes) < self.volumes.maxlen:
+            return 30
+        total = self.volumes[0]
+        for v in list(self.volumes)[1:]:
+            total = total + v
+        avg_vol = total / self.volumes.maxlen
+        if current_vol > avg_vol * 1.3:
+            return 100
+        elif current_vol > avg_vol:
+            return 60
+        return 30
+
+    def _update_adx(self, high, low, close, age):
+        if age == 0:
+            return
+        prev_high, prev_low, prev_close = self.prev
+        tr = max(high, prev_close) - min(low, prev_close)
+        diff_up = high - prev_high
+        diff_down = prev_low - low
+        pos = diff_up if diff_up > diff_down and diff_up > 0 else 0.0
+        neg = diff_down if diff_down > diff_up and diff_down > 0 else 0.0
+        trs = self.trs.update(age, tr)
+        dip_sum = self.dip_sum.update(age, abs(pos))
+        din_sum = self.din_sum.update(age, abs(neg))
+        if age < self.window:
+            return
+        dip = 100 * (dip_sum / trs) if trs != 0 else 0
+        din = 100 * (din_sum / trs) if trs != 0 else 0
+        dx = 100 * abs((dip - din) / (dip + din)) if dip + din != 0 else 0
+        if age < 2 * self.window - 1:
+            self.dx_seed.append(dx)
+        elif age == 2 * self.window - 1:
+            self.dx_seed.append(dx)
+            self.adx = float(np.array(self.dx_seed, dtype=np.float64).mean())
+            self.dx_seed = []
+        else:
+            self.adx = ((self.adx * (self.window - 1)) + dx) / float(self.window)
+
+    def _adx_score(self):
+        if math.isnan(self.adx):
+            return None
+        if self.adx > 25:
+            return 100
+        elif self.adx > 20:
+            return 60
+        return 30
+
+    def calculate_weighted_score(self):
+        return weighted_score(self.scores)
@@ -0,0 +1,86 @@
+# market_cache.py
+
+import threading
+import time
+from config import CACHE_TTL_SECONDS
+from metrics import metrics
+
+# Process-wide cache shared by every Streamlit session. Streamlit re-runs the page script
+# per session but imports modules once, so a module-level instance is seen by all viewers.
+
+class _Entry:
+    __slots__ = ("value", "loaded_at", "refreshing", "lock")
+
+    def __init__(self):
+        self.value = None
+        self.loaded_at = None
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+class MarketCache:
+    def __init__(self, ttls=CACHE_TTL_SECONDS, clock=time.monotonic):
+        self.ttls = dict(ttls)
+        self.clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, key):
+        with self._lock:
+            return self._entries.setdefault(key, _Entry())
+
+    def get(self, kind, key, loader):
+        # kind picks the TTL; key identifies the request, e.g. ("bitcoin", "5m")
+        entry = self._entry((kind, key))
+        ttl = self.ttls.get(kind, 60)
+        with entry.lock:
+            if entry.loaded_at is None:
+                # First viewer loads synchronously; concurrent viewers wait on the same lock
+                metrics.incr("market_cache.miss")
+                entry.value = loader()
+                entry.loaded_at = self.clock()
+                return entry.value
+            if self.clock() - entry.loaded_at < ttl:
+                metrics.incr("market_cache.hit")
+                return entry.value
+            # Stale: serve the last value now and refresh once in the background
+            metrics.incr("market_cache.stale")
+            if not entry.refreshing:
+                entry.refreshing = True
+                threading.Thread(target=self._refresh, args=(kind, entry, loader), daemon=True).start()
+            return entry.value
+
+    def _refresh(self, kind, entry, loader):
+        try:
+            with metrics.timer(f"market_cache.refresh.{kind}"):
+                value = loader()
+        except Exception as e:
+            # Keep serving the stale value; the next stale read retries
+            metrics.incr("market_cache.refresh_failed")
+            print(f"[market_cache] refresh of {kind} failed: {e}")
+            with entry.lock:
+                entry.refreshing = False
+            return
+        with entry.lock:
+            entry.value = value
+            entry.loaded_at = self.clock()
+            entry.refreshing = False
+
+    def invalidate(self, kind=None, key=None):
+        # No arguments drops everything; kind alone drops every entry of that kind
+        with self._lock:
+            if kind is None:
+                self._entries.clear()
+            elif key is None:
+                for k in [k for k in self._entries if k[0] == kind]:
+                    del self._entries[k]
+            else:
+                self._entries.pop((kind, key), None)
+
+    def age(self, kind, key):
+        with self._lock:
+            entry = self._entries.get((kind, key))
+        if entry is None or entry.loaded_at is None:
+            return None
+        return self.clock() - entry.loaded_at
+
+market_cache = MarketCache()
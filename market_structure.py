@@ -0,0 +1,167 @@
+# market_structure.py
+
+import time
+import numpy as np
+from resample import TIMEFRAME_MS
+
+# Trailing returns per estimate: 48 bars is a day of 30m candles, 4h of 5m candles
+WINDOW = 48
+# Fewer paired returns than this in the window and a coin gets no estimate
+MIN_PERIODS = 24
+SUBSCORE = "Decoupling"
+
+class AlignedCandles:
+    # Every coin's closes in one sorted array keyed by (coin, bucket), so looking up a
+    # bucket grid for all coins is one searchsorted instead of one per coin
+    def __init__(self, series_list, interval):
+        lengths = np.array([len(s) for s in series_list], dtype=np.int64)
+        timestamps = [s.timestamp for s in series_list if len(s)]
+        buckets = np.concatenate(timestamps) // interval if timestamps else np.empty(0, dtype=np.int64)
+        self.close = np.concatenate([s.close for s in series_list if len(s)]) if timestamps else np.empty(0)
+        # First and last bucket per coin, -1 for coins without candles
+        starts = np.cumsum(lengths) - lengths
+        nonempty = lengths > 0
+        self.first = np.full(len(series_list), -1, dtype=np.int64)
+        self.last = np.full(len(series_list), -1, dtype=np.int64)
+        self.first[nonempty] = buckets[starts[nonempty]]
+        self.last[nonempty] = buckets[starts[nonempty] + lengths[nonempty] - 1]
+        self.base = int(buckets.min()) - 1 if len(buckets) else 0
+        self.span = (int(buckets.max()) - self.base + 2) if len(buckets) else 1
+        self.keys = np.repeat(np.arange(len(series_list), dtype=np.int64), lengths) * self.span + (buckets - self.base)
+
+    def closes(self, buckets, rows):
+        # (len(rows), len(buckets)) closes, NaN where a coin has no candle in the bucket
+        out = np.full((len(rows), len(buckets)), np.nan)
+        inside = (buckets > self.base) & (buckets < self.base + self.span)
+        if not len(self.keys) or not inside.any():
+            return out
+        query = np.asarray(rows, dtype=np.int64)[:, None] * self.span + (buckets[inside] - self.base)[None, :]
+        idx = np.minimum(np.searchsorted(self.keys, query), len(self.keys) - 1)
+        out[:, inside] = np.where(self.keys[idx] == query, self.close[idx], np.nan)
+        return out
+
+    def returns(self, buckets, rows):
+        # Log return into each bucket from the bucket before it
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.log(self.closes(buckets, rows) / self.closes(buckets - 1, rows))
+
+def window_sums(x, y):
+    # x: (T,) BTC returns, y: (N, T) coin returns -> (6, N) sums over pairs present on both sides
+    m = ~np.isnan(y) & ~np.isnan(x)
+    xm = np.where(m, x, 0.0)
+    ym = np.where(m, y, 0.0)
+    return np.stack([m.sum(axis=1), xm.sum(axis=1), ym.sum(axis=1),
+                     (xm * xm).sum(axis=1), (xm * ym).sum(axis=1), (ym * ym).sum(axis=1)])
+
+def correlation_beta(sums, min_periods=MIN_PERIODS):
+    n, sx, sy, sxx, sxy, syy = sums
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        beta = cov / var_x
+        corr = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+    enough = (n >= min_periods) & (var_x > 0) & (var_y > 0)
+    return np.where(enough, corr, np.nan), np.where(enough, beta, np.nan)
+
+def decoupling_score(corr):
+    # 0-100: share of a coin's return variance BTC does not explain (1 - R^2)
+    return None if corr is None or np.isnan(corr) else int(round(100 * (1 - corr * corr)))
+
+class MarketStructure:
+    # Rolling correlation and beta of every coin's returns against BTC over the last `window`
+    # closed bars of one timeframe. Coins are rows of a (coins, window) ring of returns
+    # aligned on the UTC bucket grid; the window sums behind the estimates are kept per
+    # row, so each update only adds the new bars and subtracts the ones leaving the window.
+    def __init__(self, timeframe="30m", window=WINDOW, min_periods=MIN_PERIODS):
+        self.interval = TIMEFRAME_MS[timeframe]
+        self.window = window
+        self.min_periods = min_periods
+        self.rows = {}
+        self.buckets = np.full(window, -1, dtype=np.int64)
+        self.x = np.full(window, np.nan)
+        self.y = np.empty((0, window))
+        self.sums = np.zeros((6, 0))
+        self.pos = 0
+        self.pushes = 0
+
+    def update(self, btc_candles, candles, now_ms=None):
+        # btc_candles and candles ({coin_id: CandleSeries}) in this timeframe; the still
+        # forming bucket is left out until it closes
+        now_bucket = int((now_ms if now_ms is not None else time.time() * 1000) // self.interval)
+        if btc_candles.empty:
+            return
+        btc = AlignedCandles([btc_candles], self.interval)
+        btc_buckets = btc_candles.timestamp // self.interval
+        last = self.buckets[(self.pos - 1) % self.window]
+        new = btc_buckets[(btc_buckets > last) & (btc_buckets < now_bucket)][-self.window:]
+
+        coin_ids = list(candles)
+        added = np.array([coin_id not in self.rows for coin_id in coin_ids], dtype=bool)
+        if added.any():
+            for coin_id in np.asarray(coin_ids, dtype=object)[added]:
+                self.rows[coin_id] = len(self.rows)
+            self.y = np.vstack([self.y, np.full((int(added.sum()), self.window), np.nan)])
+            self.sums = np.hstack([self.sums, np.zeros((6, int(added.sum())))])
+        rows = np.array([self.rows[coin_id] for coin_id in coin_ids], dtype=np.int64)
+        aligned = AlignedCandles([candles[coin_id] for coin_id in coin_ids], self.interval)
+        local = np.arange(len(coin_ids))
+
+        if len(new):
+            y_new = np.full((len(self.rows), len(new)), np.nan)
+            y_new[rows] = aligned.returns(new, local)
+            self._push(new, btc.returns(new, [0])[0], y_new)
+
+        # New coins, and coins whose candles now cover bars that were missing (deferred
+        # refreshes, late data), are recomputed over the window; the rest are untouched
+        covered = (self.buckets > aligned.first[:, None]) & (self.buckets <= aligned.last[:, None])
+        gaps = (covered & np.isnan(self.y[rows]) & ~np.isnan(self.x)).any(axis=1)
+        stale = added | gaps
+        if stale.any():
+            ring = self.buckets >= 0
+            y = np.full((int(stale.sum()), self.window), np.nan)
+            y[:, ring] = aligned.returns(self.buckets[ring], local[stale])
+            self.y[rows[stale]] = y
+            self.sums[:, rows[stale]] = window_sums(self.x, y)
+
+    def _push(self, buckets, x_new, y_new):
+        count = len(buckets)
+        # Rebuilding from the ring once per window of pushes keeps add/subtract rounding from drifting
+        rebuild = self.pushes + count >= self.window
+        if not rebuild:
+            self.sums -= window_sums(*self._slots(count))
+            self.sums += window_sums(x_new, y_new)
+        for k in range(count):
+            self._write(buckets[k], x_new[k], y_new[:, k])
+        if rebuild:
+            self.sums = window_sums(self.x, self.y)
+            self.pushes = 0
+        else:
+            self.pushes += count
+
+    def _slots(self, count):
+        # Ring slots the next `count` bars overwrite
+        slots = (self.pos + np.arange(count)) % self.window
+        return self.x[slots], self.y[:, slots]
+
+    def _write(self, bucket, x, y):
+        self.buckets[self.pos] = bucket
+        self.x[self.pos] = x
+        self.y[:, self.pos] = y
+        self.pos = (self.pos + 1) % self.window
+
+    def stats(self, coin_ids=None):
+        # {coin_id: (correlation, beta)}, NaN where there are too few paired returns
+        corr, beta = correlation_beta(self.sums, self.min_periods)
+        coin_ids = self.rows if coin_ids is None else coin_ids
+        return {c: (float(corr[self.rows[c]]), float(beta[self.rows[c]])) for c in coin_ids if c in self.rows}
+
+    def forget(self, keep):
+        # Drop coins that left the universe
+        kept = [c for c in self.rows if c in keep]
+        if len(kept) == len(self.rows):
+            return
+        idx = [self.rows[c] for c in kept]
+        self.y = self.y[idx]
+        self.sums = self.sums[:, idx]
+        self.rows = {c: i for i, c in enumerate(kept)}
@@ -0,0 +1,142 @@
+# metrics.py
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Per-timer sample window used for percentiles; counts and totals are kept exactly
+SAMPLE_WINDOW = 2048
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.samples = defaultdict(lambda: deque(maxlen=SAMPLE_WINDOW))
+            self.timer_counts = defaultdict(int)
+            self.timer_totals = defaultdict(float)
+            self.counters = defaultdict(float)
+            self.gauges = {}
+
+    @contextmanager
+    def timer(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            self.samples[name].append(seconds)
+            self.timer_counts[name] += 1
+            self.timer_totals[name] += seconds
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def percentile(self, name, q):
+        with self._lock:
+            values = sorted(self.samples.get(name, ()))
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+    def snapshot(self):
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self.samples.items()}
+            timers = {}
+            for name, values in samples.items():
+                timers[name] = {
+                    "count": self.timer_counts[name],
+                    "total_s": round(self.timer_totals[name], 6),
+                    **{f"p{int(q * 100)}_ms": round(values[min(len(values) - 1, int(round(q * (len(values) - 1))))] * 1000, 3)
+                       for q in QUANTILES},
+                    "max_ms": round(values[-1] * 1000, 3),
+                }
+            return {
+                "timestamp": time.time(),
+                "timers": timers,
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+
+    def hit_rate(self, hits, misses):
+        with self._lock:
+            total = self.counters.get(hits, 0) + self.counters.get(misses, 0)
+            return self.counters.get(hits, 0) / total if total else None
+
+    def to_prometheus(self, prefix="crypto_signals"):
+        snap = self.snapshot()
+        lines = [f"# TYPE {prefix}_timer_seconds summary"]
+        for name, timer in snap["timers"].items():
+            label = _label(name)
+            for q in QUANTILES:
+                lines.append(f'{prefix}_timer_seconds{{timer="{label}",quantile="{q}"}} {timer[f"p{int(q * 100)}_ms"] / 1000}')
+            lines.append(f'{prefix}_timer_seconds_sum{{timer="{label}"}} {timer["total_s"]}')
+            lines.append(f'{prefix}_timer_seconds_count{{timer="{label}"}} {timer["count"]}')
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in snap["counters"].items():
+            lines.append(f'{prefix}_events_total{{counter="{_label(name)}"}} {value}')
+        lines.append(f"# TYPE {prefix}_gauge gauge")
+        for name, value in snap["gauges"].items():
+            lines.append(f'{prefix}_gauge{{gauge="{_label(name)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        # JSON for .json paths, Prometheus text format otherwise; replaced atomically. Each
+        # write gets its own temp file, so concurrent writers (dashboard sessions) never race
+        text = json.dumps(self.snapshot(), indent=2) if path.endswith(".json") else self.to_prometheus()
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+def _label(name):
+    return name.replace("\\", "\\\\").replace('"', '\\"')
+
+def serve_prometheus(port, registry=None, host="127.0.0.1"):
+    registry = registry or metrics
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# Process-wide registry shared by the fetcher, the engine, the scanner and the dashboard
+metrics = Metrics()
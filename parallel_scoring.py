@@ -0,0 +1,102 @@
+# parallel_scoring.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from batch_indicator_engine import BatchIndicatorEngine, subscore_records, weighted_scores
+from candle_series import CandleSeries
+from config import SCORING_WORKERS, SCORING_CHUNK_SIZE
+
+# Candle buffers shipped to workers, one row each, every coin's candles back to back
+FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+
+def _score_series(coin_ids, series_list):
+    engine = BatchIndicatorEngine.from_series(coin_ids, series_list)
+    matrix = engine.subscore_matrix()
+    return matrix, weighted_scores(matrix)
+
+def _score_shared(shm_name, total, bounds, has_volume, forming):
+    # Worker side: scores coins [bounds[0], bounds[-1]) straight from the shared block and
+    # returns a (coins, indicators) float64 matrix plus the weighted scores
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        block = np.ndarray((len(FIELDS), total), dtype=np.float64, buffer=shm.buf)
+        series_list = []
+        for i, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+            rows = [block[f, start:end] for f in range(len(FIELDS))]
+            series_list.append(CandleSeries(rows[0].astype(np.int64), *rows[1:5],
+                                            rows[5] if has_volume[i] else None, forming[i]))
+        result = _score_series(list(range(len(series_list))), series_list)
+        # Views into the block must be gone before it can be closed
+        del block, rows, series_list
+        return result
+    finally:
+        shm.close()
+
+class ParallelScorer:
+    # Shards coins across a process pool. Candles go through one shared-memory block per
+    # call instead of being pickled; workers send back only the subscore matrix. Scores
+    # equal IndicatorEngineV2's. workers=1 scores in-process.
+    def __init__(self, workers=SCORING_WORKERS, chunk_size=SCORING_CHUNK_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def score(self, items):
+        # items: [(coin_id, CandleSeries)] -> {coin_id: (subscores, weighted score)}
+        coin_ids = [coin_id for coin_id, _ in items]
+        series_list = [series.dropna() for _, series in items]
+        if not items:
+            return {}
+        if self.workers == 1:
+            matrix, weighted = _score_series(coin_ids, series_list)
+            return dict(zip(coin_ids, zip(subscore_records(matrix), weighted)))
+
+        lengths = np.array([len(s) for s in series_list], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        total = int(offsets[-1])
+        shm = shared_memory.SharedMemory(create=True, size=max(1, total * len(FIELDS) * 8))
+        try:
+            block = np.ndarray((len(FIELDS), total), dtype=np.float64, buffer=shm.buf)
+            has_volume, forming = [], []
+            for series, start, end in zip(series_list, offsets[:-1], offsets[1:]):
+                for f, field in enumerate(FIELDS):
+                    values = getattr(series, field)
+                    block[f, start:end] = np.nan if values is None else values
+                has_volume.append(series.volume is not None)
+                forming.append(bool(series.forming))
+            del block
+
+            futures = []
+            for first in range(0, len(items), self.chunk_size):
+                last = min(first + self.chunk_size, len(items))
+                futures.append(self._executor().submit(
+                    _score_shared, shm.name, total, offsets[first:last + 1].tolist(), has_volume[first:last],
+                    forming[first:last]))
+            matrices, weighted = [], []
+            for future in futures:
+                matrix, scores = future.result()
+                matrices.append(matrix)
+                weighted.extend(scores)
+        finally:
+            shm.close()
+            shm.unlink()
+        records = subscore_records(np.vstack(matrices))
+        return dict(zip(coin_ids, zip(records, weighted)))
@@ -0,0 +1,66 @@
+# prescreen.py
+
+import numpy as np
+from config import PRESCREEN_MARGIN, BUY_THRESHOLD
+from indicator_engine_v2 import INDICATOR_WEIGHTS
+from metrics import metrics
+
+# RSI(14) points per 1% move over the last hour, and how far below that estimate the
+# real RSI is allowed to be before the bound stops covering it
+RSI_PER_PCT_1H = 8.0
+RSI_SLACK = 20.0
+# Below this position in the 24h high/low range on a down day, close is taken to be under EMA50
+EMA_RANGE_FLOOR = 0.25
+# Points a MACD plus StochRSI crossover adds to the weighted score. The bound scores both
+# as no-cross, so the margin is the recall knob: 0 skips the most coins, CROSS_POINTS
+# never skips one for lack of a crossover (and then nothing is skipped at all)
+CROSS_POINTS = 70 * (INDICATOR_WEIGHTS['MACD'] + INDICATOR_WEIGHTS['StochRSI']) / sum(INDICATOR_WEIGHTS.values())
+
+def score_bounds(universe, assume_crosses=False):
+    # Optimistic weighted buy score per coin from /coins/markets fields alone. Volume and
+    # ADX are taken at their maximum; MACD and StochRSI crossovers only happen on a few
+    # percent of bars, so they count as no-cross unless assume_crosses. With crossovers
+    # assumed every bound is at least 61, so nothing would ever be skipped.
+    change_1h = universe["price_change_percentage_1h_in_currency"].to_numpy(dtype=np.float64)
+    change_24h = universe["price_change_percentage_24h_in_currency"].to_numpy(dtype=np.float64)
+    price = universe["current_price"].to_numpy(dtype=np.float64)
+    high = universe["high_24h"].to_numpy(dtype=np.float64)
+    low = universe["low_24h"].to_numpy(dtype=np.float64)
+
+    rsi_floor = np.clip(50 + RSI_PER_PCT_1H * np.nan_to_num(change_1h) - RSI_SLACK, 0, 100)
+    rsi = np.clip((70 - rsi_floor) * (100 / 40), 0, 100)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        position = (price - low) / (high - low)
+    below_ema = (position < EMA_RANGE_FLOOR) & (change_24h < 0)
+    ema = np.where(below_ema, 30.0, 100.0)
+    cross = 100.0 if assume_crosses else 30.0
+
+    bounds = {'RSI': rsi, 'MACD': cross, 'EMA': ema, 'Volume': 100.0, 'StochRSI': cross, 'ADX': 100.0}
+    total = sum(bounds[name] * w for name, w in INDICATOR_WEIGHTS.items())
+    return total / sum(INDICATOR_WEIGHTS.values())
+
+def prescreen(universe, threshold=BUY_THRESHOLD, margin=PRESCREEN_MARGIN, assume_crosses=False):
+    # Boolean mask of coins worth an OHLC fetch: those whose bound reaches threshold - margin
+    keep = score_bounds(universe, assume_crosses) >= threshold - margin
+    skipped = int((~keep).sum())
+    metrics.set_gauge("prescreen.kept", int(keep.sum()))
+    metrics.set_gauge("prescreen.skipped", skipped)
+    metrics.incr("prescreen.fetches_saved", skipped)
+    return keep
+
+def tradeoff(universe, buy_scores, threshold=BUY_THRESHOLD, margins=(0, 5, 10, 15, 20), assume_crosses=False):
+    # From a full (unscreened) scan: per margin, the share of fetches saved and the share of
+    # qualifying coins that would still have been fetched. buy_scores: {coin_id: score}
+    bounds = score_bounds(universe, assume_crosses)
+    ids = universe["id"].to_numpy()
+    scored = np.array([coin_id in buy_scores for coin_id in ids])
+    qualifying = np.array([buy_scores.get(coin_id, 0) >= threshold for coin_id in ids])
+    rows = []
+    for margin in margins:
+        keep = bounds >= threshold - margin
+        rows.append({
+            "margin": margin,
+            "fetches_saved": float((~keep[scored]).mean()) if scored.any() else 0.0,
+            "recall": float(keep[qualifying].mean()) if qualifying.any() else 1.0,
+        })
+    return rows
@@ -0,0 +1,80 @@
+# refresh_scheduler.py
+
+import math
+import time
+import numpy as np
+from config import (REFRESH_BUDGET_PER_MIN, REFRESH_MIN_INTERVAL_SECONDS, REFRESH_MAX_INTERVAL_SECONDS,
+                    SCAN_INTERVAL_SECONDS, BUY_THRESHOLD)
+from rate_limiter import TokenBucket
+
+# Coins within this many points of the threshold get the proximity boost
+SCORE_BAND = 15
+# Per-candle log-return volatility that counts as fully volatile (2%)
+VOLATILITY_REF = 0.02
+# Share of the priority given to volatility, threshold proximity and market-cap rank
+PRIORITY_WEIGHTS = (0.45, 0.4, 0.15)
+
+def realized_volatility(close):
+    close = np.asarray(close, dtype=np.float64)
+    close = close[close > 0]
+    if len(close) < 3:
+        return 0.0
+    return float(np.std(np.diff(np.log(close))))
+
+class RefreshScheduler:
+    # Decides which coins a scan cycle refetches. Each coin gets a refresh interval between
+    # min_interval and max_interval from its volatility, how close its weighted score is to
+    # the buy threshold and its market-cap rank; due coins are taken most overdue first
+    # until the per-minute API budget is spent. Everything else is rescored from stored candles.
+    def __init__(self, budget_per_min=REFRESH_BUDGET_PER_MIN, min_interval=REFRESH_MIN_INTERVAL_SECONDS,
+                 max_interval=REFRESH_MAX_INTERVAL_SECONDS, cycle_seconds=SCAN_INTERVAL_SECONDS,
+                 clock=time.monotonic):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.clock = clock
+        # Unspent budget carries over for at most one cycle
+        self.budget = TokenBucket(budget_per_min, capacity=max(1, int(budget_per_min * cycle_seconds / 60)))
+        self.last_refresh = {}
+        self.intervals = {}
+
+    def priority(self, score, volatility, rank, universe):
+        vol = min(1.0, volatility / VOLATILITY_REF)
+        proximity = max(0.0, 1.0 - abs(score - BUY_THRESHOLD) / SCORE_BAND) if score is not None else 1.0
+        cap = 1.0 - (rank - 1) / max(1, universe) if rank else 0.0
+        w_vol, w_prox, w_cap = PRIORITY_WEIGHTS
+        return w_vol * vol + w_prox * proximity + w_cap * cap
+
+    def interval_for(self, score, volatility, rank, universe):
+        # Geometric between the bounds so priority 0.5 is the geometric mean interval
+        p = self.priority(score, volatility, rank, universe)
+        return self.min_interval * (self.max_interval / self.min_interval) ** (1.0 - p)
+
+    def observe(self, coin_id, score, volatility, rank, universe, refreshed):
+        if refreshed:
+            self.last_refresh[coin_id] = self.clock()
+        self.intervals[coin_id] = self.interval_for(score, volatility, rank, universe)
+
+    def select(self, coin_ids, is_free=None):
+        # coin_ids in market-cap order. Returns the set to refetch this cycle; is_free(coin_id)
+        # marks coins the candle cache can serve without an API call, which cost no budget.
+        now = self.clock()
+
+        def overdue(coin_id):
+            if coin_id not in self.last_refresh:
+                return math.inf
+            return (now - self.last_refresh[coin_id]) / self.intervals.get(coin_id, self.min_interval)
+
+        ranked = sorted(((overdue(c), -i, c) for i, c in enumerate(coin_ids)), reverse=True)
+        selected = set()
+        for ratio, _, coin_id in ranked:
+            if ratio < 1:
+                break
+            if (is_free and is_free(coin_id)) or self.budget.try_acquire():
+                selected.add(coin_id)
+        return selected
+
+    def forget(self, keep):
+        # Drop state for coins that left the universe
+        for table in (self.last_refresh, self.intervals):
+            for coin_id in [c for c in table if c not in keep]:
+                del table[coin_id]
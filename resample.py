@@ -0,0 +1,43 @@
+
+import time
+import numpy as np
+from candle_series import CandleSeries
+
+TIMEFRAME_MS = {
+    "5m": 5 * 60 * 1000,
+    "30m": 30 * 60 * 1000,
+    "1h": 3600 * 1000,
+    "4h": 4 * 3600 * 1000,
+    "1d": 86400 * 1000,
+}
+
+def resample(candles, timeframe, now_ms=None):
+    # Aggregates a finer CandleSeries into UTC-aligned buckets: first open, max high, min low,
+    # last close. Volume is market_chart's rolling 24h total_volumes, a level rather than a
+    # per-candle amount, so each bucket takes its last value like close. Each candle is
+    # stamped with its bucket start; the newest bucket is kept even if still forming, as the
+    # API does, and flagged so the Volume subscore is read at the last closed bucket.
+    # market_chart points are close-only, so high and low are the bucket's highest and
+    # lowest close: a narrower range than /ohlc candles, which lowers true range and ADX.
+    # One pass of ufunc.reduceat.
+    interval = TIMEFRAME_MS[timeframe]
+    if candles.empty:
+        return candles
+    bucket = candles.timestamp // interval
+    now_bucket = int((now_ms if now_ms is not None else time.time() * 1000) // interval)
+    forming = bool(bucket[-1] >= now_bucket)
+    starts = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+    if len(starts) == len(candles):
+        # Already at (or coarser than) this timeframe; only the forming flag is set
+        return CandleSeries(candles.timestamp, candles.open, candles.high, candles.low, candles.close,
+                            candles.volume, forming=forming)
+    ends = np.append(starts[1:], len(candles)) - 1
+    return CandleSeries(
+        bucket[starts] * interval,
+        candles.open[starts],
+        np.maximum.reduceat(candles.high, starts),
+        np.minimum.reduceat(candles.low, starts),
+        candles.close[ends],
+        None if candles.volume is None else candles.volume[ends],
+        forming=forming,
+    )
@@ -0,0 +1,79 @@
+# rescoring.py
+
+import numpy as np
+from batch_indicator_engine import INDICATORS
+from config import BUY_THRESHOLD
+from indicator_engine_v2 import INDICATOR_WEIGHTS
+from market_structure import SUBSCORE
+
+# The scanner's indicators plus subscores buy_score leaves out, which weigh 0 unless set
+COLUMNS = INDICATORS + [SUBSCORE]
+
+def weight_vector(weights=INDICATOR_WEIGHTS):
+    return np.array([float(weights.get(name, 0.0)) for name in COLUMNS])
+
+class SubscoreMatrix:
+    # The subscores of one scan as a (coins, indicators) matrix, so a ranking under other
+    # weights is two matrix-vector products: no candles, no API calls, no indicators.
+    # Matches weighted_score: indicators without a subscore drop out of a coin's average.
+    def __init__(self, signals):
+        self.signals = signals
+        matrix = np.array([[np.nan if sig["subscores"].get(name) is None else sig["subscores"][name]
+                            for name in COLUMNS] for sig in signals], dtype=np.float64).reshape(-1, len(COLUMNS))
+        self.present = (~np.isnan(matrix)).astype(np.float64)
+        self.values = np.nan_to_num(matrix)
+        # Lazily scored coins stopped once 60 was out of reach; their missing subscores
+        # were never computed, so only an upper bound is known under other weights
+        self.partial = np.array([bool(sig.get("partial")) for sig in signals], dtype=bool)
+        self.btc_corr = np.array([np.nan if sig.get("btc_corr") is None else sig["btc_corr"] for sig in signals],
+                                 dtype=np.float64)
+
+    def __len__(self):
+        return len(self.signals)
+
+    def scores(self, weights=INDICATOR_WEIGHTS):
+        w = weight_vector(weights)
+        totals = self.values @ w
+        weight_totals = self.present @ w
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(weight_totals > 0, np.round(totals / weight_totals, 2), 0.0)
+
+    def upper_bounds(self, weights=INDICATOR_WEIGHTS):
+        # Every unevaluated subscore at 100; exact for fully scored coins
+        w = weight_vector(weights)
+        missing = 1.0 - self.present
+        totals = self.values @ w + 100.0 * (missing @ w)
+        weight_totals = self.present @ w + missing @ w
+        with np.errstate(invalid="ignore", divide="ignore"):
+            bounds = np.where(weight_totals > 0, totals / weight_totals, 0.0)
+        return np.where(self.partial, bounds, self.scores(weights))
+
+    def rank(self, weights=INDICATOR_WEIGHTS, threshold=BUY_THRESHOLD, limit=None, max_btc_corr=None):
+        # Returns (signals, undetermined): copies of the signals scoring >= threshold under
+        # `weights`, best first, and how many lazily scored coins might also qualify but
+        # need a full scan to tell. max_btc_corr drops coins moving with BTC more closely
+        # than that; coins without an estimate are kept.
+        scores = self.scores(weights)
+        allowed = np.ones(len(self), dtype=bool)
+        if max_btc_corr is not None:
+            allowed = ~(self.btc_corr > max_btc_corr)
+        qualifies = (scores >= threshold) & ~self.partial & allowed
+        undetermined = int(np.count_nonzero(self.partial & allowed & (self.upper_bounds(weights) >= threshold)))
+        rows = np.flatnonzero(qualifies)
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+        if limit is not None:
+            rows = rows[:limit]
+        return [dict(self.signals[i], buy_score=float(scores[i])) for i in rows], undetermined
+
+_matrices = {}
+
+def subscore_matrix(signals, key):
+    # One matrix per scan (key, e.g. the snapshot's mode and scan time). A reload of the same
+    # scan only swaps in the new signal dicts, which rank() copies display fields from.
+    cached = _matrices.get(key)
+    if cached is None or len(cached) != len(signals):
+        if len(_matrices) > 8:
+            _matrices.clear()
+        cached = _matrices[key] = SubscoreMatrix(signals)
+    cached.signals = signals
+    return cached
@@ -0,0 +1,214 @@
+# resilience.py
+
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import MAX_CONCURRENT_FETCHES
+from metrics import metrics
+
+# Successful response times kept per endpoint; the hedge delay is their p95
+LATENCY_WINDOW = 256
+HEDGE_QUANTILE = 0.95
+# Until an endpoint has this many samples, hedge after HEDGE_DEFAULT_DELAY seconds
+MIN_LATENCY_SAMPLES = 20
+HEDGE_DEFAULT_DELAY = 1.0
+# Retries and hedges together may add at most this share of extra requests on top of
+# first attempts; the capacity lets a quiet process retry a short burst
+RETRY_RATIO = 0.1
+RETRY_BUDGET_CAPACITY = 10
+MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 0.2
+BACKOFF_CAP_SECONDS = 2.0
+# Wall-clock limit for one call including hedges, retries and backoff
+CALL_DEADLINE_SECONDS = 8.0
+# Consecutive failed attempts that open an endpoint's circuit, and how long it stays open
+# before one probe request is let through
+FAILURE_THRESHOLD = 5
+OPEN_SECONDS = 30.0
+
+class CircuitOpenError(Exception):
+    pass
+
+def is_retryable(error):
+    # Timeouts, connection errors, 429 and 5xx are worth another try; other HTTP errors
+    # (a delisted coin's 404) would fail the same way again
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    return status is None or status == 429 or status >= 500
+
+class RetryBudget:
+    # Every first attempt deposits `ratio` of a token, every retry or hedge spends a whole
+    # one, so a degraded API sees at most ~10% extra load instead of MAX_ATTEMPTS times as much
+    def __init__(self, ratio=RETRY_RATIO, capacity=RETRY_BUDGET_CAPACITY):
+        self.ratio = ratio
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def try_spend(self):
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, open_seconds=OPEN_SECONDS, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        # True while calls are being rejected; False again once a probe would be let through
+        with self._lock:
+            return self.state == "open" and self.clock() - self.opened_at < self.open_seconds
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and self.clock() - self.opened_at >= self.open_seconds:
+                self._set_state("half_open")
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._set_state("closed")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+                self._set_state("open")
+
+    def _set_state(self, state):
+        if state != self.state:
+            metrics.incr(f"circuit.{state}")
+        self.state = state
+        metrics.set_gauge(f"circuit.{self.name}.open", int(state != "closed"))
+
+class ResilientCaller:
+    # Wraps idempotent calls per endpoint: a duplicate request goes out once the first has
+    # taken longer than the endpoint's p95, failures are retried with full-jitter backoff
+    # while the retry budget lasts, and an endpoint that keeps failing is short-circuited
+    # with CircuitOpenError so callers fall back at once instead of waiting out timeouts.
+    # Callers pay the rate limiter for first attempts; every hedge or retry takes one more
+    # token from `limiter` and is skipped when none is left, so they never overrun the quota.
+    def __init__(self, max_attempts=MAX_ATTEMPTS, deadline=CALL_DEADLINE_SECONDS, budget=None, limiter=None,
+                 workers=2 * MAX_CONCURRENT_FETCHES + 2, clock=time.monotonic):
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.budget = budget or RetryBudget()
+        self.limiter = limiter
+        self.clock = clock
+        self._latency = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resilience")
+
+    def breaker(self, endpoint):
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(endpoint, clock=self.clock)
+            return self._breakers[endpoint]
+
+    def is_open(self, endpoint):
+        return self.breaker(endpoint).is_open()
+
+    def record_latency(self, endpoint, seconds):
+        with self._lock:
+            self._latency[endpoint].append(seconds)
+
+    def hedge_delay(self, endpoint):
+        with self._lock:
+            samples = sorted(self._latency.get(endpoint, ()))
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return samples[min(len(samples) - 1, int(round(HEDGE_QUANTILE * (len(samples) - 1))))]
+
+    def _extra_attempt(self):
+        # One more request on top of the first: needs both a retry budget and a limiter token
+        if not self.budget.try_spend():
+            return False
+        if self.limiter is not None and not self.limiter.try_acquire():
+            metrics.incr("resilience.rate_limited")
+            return False
+        return True
+
+    def call(self, endpoint, fn):
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            metrics.incr("resilience.short_circuited")
+            raise CircuitOpenError(endpoint)
+        self.budget.deposit()
+        deadline = self.clock() + self.deadline
+        attempt = 1
+        while True:
+            try:
+                result = self._hedged(endpoint, fn, deadline)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The endpoint answered; the request itself was bad
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                backoff = random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+                if (attempt >= self.max_attempts or self.clock() + backoff >= deadline
+                        or not self._extra_attempt()):
+                    raise
+                time.sleep(backoff)
+                if not breaker.allow():
+                    metrics.incr("resilience.short_circuited")
+                    raise CircuitOpenError(endpoint) from e
+                metrics.incr("resilience.retries")
+                attempt += 1
+                continue
+            breaker.record_success()
+            return result
+
+    def _hedged(self, endpoint, fn, deadline):
+        def attempt():
+            started = time.perf_counter()
+            result = fn()
+            self.record_latency(endpoint, time.perf_counter() - started)
+            return result
+
+        futures = [self._pool.submit(attempt)]
+        done, _ = wait(futures, timeout=max(0.0, min(self.hedge_delay(endpoint), deadline - self.clock())))
+        if not done and self.clock() < deadline and self._extra_attempt():
+            metrics.incr("resilience.hedges")
+            futures.append(self._pool.submit(attempt))
+        error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - self.clock()), return_when=FIRST_COMPLETED)
+            if not done:
+                # The stragglers finish in the background; their results are dropped
+                metrics.incr("resilience.deadline_exceeded")
+                raise TimeoutError(f"{endpoint}: no response within {self.deadline}s")
+            for future in done:
+                if future.exception() is None:
+                    if len(futures) > 1 and future is futures[1]:
+                        metrics.incr("resilience.hedge_wins")
+                    return future.result()
+                error = error or future.exception()
+        raise error
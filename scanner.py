@@ -0,0 +1,304 @@
+# scanner.py
+
+import argparse
+import random
+import time
+from config import (TOP_N_COINS, MAX_CONCURRENT_FETCHES, SCAN_INTERVAL_SECONDS, METRICS_PATH, REFRESH_BUDGET_PER_MIN,
+                    SCORING_WORKERS, SCORING_CHUNK_SIZE, BUY_THRESHOLD, SIGNAL_STORE_PATH,
+                    SIGNAL_RETENTION_DAYS, CANDLE_RETENTION_DAYS, CANDLE_PRUNE_INTERVAL_SECONDS)
+from fetcher import (get_market_universe, fetch_ohlc_concurrently, get_candles, get_candle_store, is_cached,
+                     mode_timeframe, rate_limiter)
+from refresh_scheduler import RefreshScheduler, realized_volatility
+from parallel_scoring import ParallelScorer
+from prescreen import prescreen
+from market_structure import MarketStructure, SUBSCORE, decoupling_score
+from indicator_engine_v2 import IndicatorEngineV2
+from snapshot_store import snapshot_path, publish_snapshot
+from signal_store import SignalStore
+from event_server import EventHub, SignalEventTracker, serve_events
+from metrics import metrics, serve_prometheus
+from http_client import new_cycle
+
+PERIODS = ["1h", "24h", "7d"]
+# The dashboard shows qualifying coins among the top DISPLAY_LIMIT signals
+DISPLAY_LIMIT = 20
+
+signal_store = None
+
+def get_signal_store():
+    # Opened on first publish so importing the scanner (e.g. from the dashboard) creates no database
+    global signal_store
+    if signal_store is None:
+        signal_store = SignalStore(SIGNAL_STORE_PATH)
+    return signal_store
+
+STABLE_KEYWORDS = ["usd", "usdt", "usdc", "tether", "dai", "busd", "stable"]
+
+def stablecoin_mask(universe):
+    # Name or symbol contains a stablecoin keyword
+    pattern = "|".join(STABLE_KEYWORDS)
+    name = universe["name"].fillna("").str.lower().str.contains(pattern, regex=True)
+    symbol = universe["symbol"].fillna("").str.lower().str.contains(pattern, regex=True)
+    return (name | symbol).to_numpy()
+
+def universe_records(universe):
+    # Row dicts with missing fields as None, as they come from the API
+    return universe.astype(object).where(universe.notna(), None).to_dict("records")
+
+def generate_human_analysis(coin, scores):
+    phrases = []
+    if scores["RSI"] is not None:
+        if scores["RSI"] > 75:
+            phrases.append(f"RSI suggests {coin} may be approaching overbought territory.")
+        elif scores["RSI"] < 30:
+            phrases.append(f"{coin} appears oversold on RSI, indicating potential upside.")
+        else:
+            phrases.append(f"RSI for {coin} is neutral, showing room for movement.")
+
+    if scores["MACD"] == 100:
+        phrases.append("MACD just crossed bullishly, a classic buy trigger.")
+    elif scores["MACD"] == 30:
+        phrases.append("MACD is flat or bearish, offering no clear signal.")
+
+    if scores["EMA"] == 100:
+        phrases.append(f"{coin} is trading above its 50 EMA, suggesting bullish momentum.")
+    elif scores["EMA"] == 30:
+        phrases.append(f"{coin} is trending below its 50 EMA, which may act as resistance.")
+
+    if scores["Volume"] is not None:
+        if scores["Volume"] >= 100:
+            phrases.append("Volume is surging above average, confirming strong interest.")
+        elif scores["Volume"] >= 60:
+            phrases.append("Volume is slightly above average, supporting the move.")
+        else:
+            phrases.append("Current volume is below average, so momentum may be lacking.")
+
+    if scores["ADX"] is not None:
+        if scores["ADX"] >= 60:
+            phrases.append("ADX shows the trend is gaining strength.")
+        else:
+            phrases.append("ADX suggests trend strength is moderate or weak.")
+
+    return " ".join(random.sample(phrases, min(4, len(phrases))))
+
+def build_signal(coin_id, coin, subscores, buy_score, period, partial=False):
+    # analysis is filled in by add_analysis for the coins that get displayed
+    return {
+        "id": coin_id,
+        "name": coin["name"],
+        "symbol": coin["symbol"].upper(),
+        "image": coin["image"],
+        "price": coin["current_price"],
+        "gain": coin.get(f"price_change_percentage_{period}_in_currency", 0.0),
+        "gains": {p: coin.get(f"price_change_percentage_{p}_in_currency", 0.0) for p in PERIODS},
+        "buy_score": buy_score,
+        "subscores": subscores,
+        "analysis": "",
+        "partial": partial,
+        "buy_price": coin["current_price"],
+        "buy_range": (coin["current_price"] * 0.985, coin["current_price"] * 1.015)
+    }
+
+def add_analysis(signals, limit=DISPLAY_LIMIT, threshold=BUY_THRESHOLD):
+    # signals sorted by buy_score; only the ones the dashboard will render get text
+    with metrics.timer("scan.analysis"):
+        for sig in signals[:limit]:
+            if sig["buy_score"] >= threshold:
+                sig["analysis"] = generate_human_analysis(sig["name"], sig["subscores"])
+    return signals
+
+def add_market_structure(signals, candles, use_market_chart, structure=None):
+    timeframe = mode_timeframe(use_market_chart)
+    structure = structure or MarketStructure(timeframe)
+    btc = candles.get("bitcoin")
+    if btc is None:
+        btc = get_candles("bitcoin", timeframe, limiter=rate_limiter)
+    structure.forget(candles)
+    structure.update(btc, candles)
+    stats = structure.stats(candles)
+    for sig in signals:
+        corr, beta = stats.get(sig["id"], (float("nan"), float("nan")))
+        sig["btc_corr"] = None if corr != corr else round(corr, 3)
+        sig["btc_beta"] = None if beta != beta else round(beta, 3)
+        sig["subscores"][SUBSCORE] = decoupling_score(corr)
+    return signals
+
+def run_scan(period="1h", use_market_chart=False, top_n=TOP_N_COINS, max_workers=MAX_CONCURRENT_FETCHES,
+             scheduler=None, scorer=None, prescreen_margin=None, lazy=True, on_signal=None, structure=None):
+    # Without a scheduler every coin is refetched (subject to the candle cache); with one,
+    # only the coins it selects are, and the rest are rescored from stored candles.
+    # Without a scorer each coin is scored inline as it lands; a ParallelScorer scores
+    # them all across processes once fetching is done. With a prescreen margin, coins
+    # whose market data rules out a buy score near 60 are dropped before any OHLC request.
+    # lazy scoring stops evaluating a coin once 60 is out of reach; such signals carry
+    # partial=True, unevaluated subscores are None and buy_score is only a lower value.
+    # on_signal(signal) is called as soon as each coin is scored. Every signal gets its
+    # rolling correlation and beta to BTC and a Decoupling subscore (not part of buy_score);
+    # pass the previous scan's MarketStructure to update it with just the new bars.
+    scan_started = time.perf_counter()
+    api_calls_before = metrics.counters.get("api.calls", 0)
+    with metrics.timer("scan.markets"):
+        universe = get_market_universe(top_n)
+        universe = universe[~stablecoin_mask(universe)]
+        if prescreen_margin is not None:
+            universe = universe[prescreen(universe, margin=prescreen_margin)]
+        coins = universe_records(universe)
+    scan_coins = {coin['id']: coin for coin in coins}
+    signals = []
+
+    refresh = set(scan_coins)
+    if scheduler is not None:
+        scheduler.forget(scan_coins)
+        refresh = scheduler.select(list(scan_coins), is_free=lambda c: is_cached(c, use_market_chart=True))
+    deferred = set(scan_coins) - refresh
+
+    # OHLC requests run concurrently under the shared rate limiter
+    loop_started = time.perf_counter()
+    scoring_seconds = 0.0
+    pending = []
+    scored_candles = {}
+    # Both modes score candles resampled from the same stored 5-minute series
+    for coin_id, candles in fetch_ohlc_concurrently(list(scan_coins), max_workers=max_workers,
+                                                    offline_ids=deferred, timeframe=mode_timeframe(use_market_chart)):
+        coin = scan_coins[coin_id]
+        if candles.empty or len(candles) < 15:
+            continue
+        scored_candles[coin_id] = candles
+
+        if scorer is not None:
+            pending.append((coin_id, candles))
+            continue
+
+        scoring_started = time.perf_counter()
+        engine = IndicatorEngineV2(candles)
+        subscores = engine.calculate_all(lazy=lazy, threshold=BUY_THRESHOLD)
+        buy_score = engine.calculate_weighted_score()
+        signals.append(build_signal(coin_id, coin, subscores, buy_score, period, engine.stopped_early))
+        if on_signal is not None:
+            on_signal(signals[-1])
+        scoring_seconds += time.perf_counter() - scoring_started
+        if scheduler is not None:
+            scheduler.observe(coin_id, buy_score, realized_volatility(candles.close), coin.get("market_cap_rank"),
+                              len(scan_coins), refreshed=coin_id in refresh)
+
+    # Fetching overlaps inline scoring, so the fetch stage is the loop time not spent scoring
+    metrics.observe("scan.ohlc_fetch", time.perf_counter() - loop_started - scoring_seconds)
+    if pending:
+        scoring_started = time.perf_counter()
+        scored = scorer.score(pending)
+        for coin_id, candles in pending:
+            subscores, buy_score = scored[coin_id]
+            signals.append(build_signal(coin_id, scan_coins[coin_id], subscores, buy_score, period))
+            if on_signal is not None:
+                on_signal(signals[-1])
+            if scheduler is not None:
+                scheduler.observe(coin_id, buy_score, realized_volatility(candles.close),
+                                  scan_coins[coin_id].get("market_cap_rank"), len(scan_coins),
+                                  refreshed=coin_id in refresh)
+        scoring_seconds += time.perf_counter() - scoring_started
+    metrics.observe("scan.scoring", scoring_seconds)
+    with metrics.timer("scan.market_structure"):
+        add_market_structure(signals, scored_candles, use_market_chart, structure)
+    signals = add_analysis(sorted(signals, key=lambda x: x["buy_score"], reverse=True))
+    metrics.observe("scan.total", time.perf_counter() - scan_started)
+    metrics.set_gauge("scan.coins", len(scan_coins))
+    metrics.set_gauge("scan.refreshed", len(refresh))
+    metrics.set_gauge("scan.deferred", len(deferred))
+    metrics.set_gauge("scan.api_calls", metrics.counters.get("api.calls", 0) - api_calls_before)
+    metrics.incr("scans")
+    return signals
+
+def scan_and_publish(use_market_chart, top_n=TOP_N_COINS, scheduler=None, scorer=None, prescreen_margin=None,
+                     on_signal=None, lazy=False, structure=None):
+    # One scan per mode covers every period: the period only picks which gain is shown.
+    # Published scans keep every subscore by default so the dashboard can re-rank them
+    # under other weights; lazy=True trades that for less scoring work.
+    started = time.time()
+    signals = run_scan(use_market_chart=use_market_chart, top_n=top_n, scheduler=scheduler, scorer=scorer,
+                       prescreen_margin=prescreen_margin, lazy=lazy, on_signal=on_signal, structure=structure)
+    mode = "full" if use_market_chart else "light"
+    store = get_signal_store()
+    with metrics.timer("scan.history"):
+        scan_id = store.append(signals, mode)
+        # What changed on the dashboard since the previous scan of this mode
+        changes = store.diff(mode, scan_id, limit=DISPLAY_LIMIT, threshold=BUY_THRESHOLD)
+        store.prune(time.time() - SIGNAL_RETENTION_DAYS * 86400)
+    snapshot = {
+        "generated_at": time.time(),
+        "scan_seconds": round(time.time() - started, 2),
+        "use_market_chart": use_market_chart,
+        "scan_id": scan_id,
+        "changes": changes,
+        "signals": signals,
+    }
+    publish_snapshot(snapshot, snapshot_path(use_market_chart))
+    return snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless crypto signal scanner")
+    parser.add_argument("--mode", nargs="+", default=["light", "full"], choices=["light", "full"])
+    parser.add_argument("--top-n", type=int, default=TOP_N_COINS)
+    parser.add_argument("--interval", type=float, default=SCAN_INTERVAL_SECONDS)
+    parser.add_argument("--once", action="store_true", help="run a single scan cycle and exit")
+    parser.add_argument("--refresh-budget", type=int, default=REFRESH_BUDGET_PER_MIN,
+                        help="OHLC refetches per minute across all modes; 0 refetches every coin every cycle")
+    parser.add_argument("--metrics-file", default=METRICS_PATH, help="Prometheus text (or .json) written after each cycle")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--score-workers", type=int, default=SCORING_WORKERS,
+                        help="score coins in this many processes after fetching; 0 scores inline")
+    parser.add_argument("--score-chunk-size", type=int, default=SCORING_CHUNK_SIZE)
+    parser.add_argument("--prescreen-margin", type=float,
+                        help="skip coins whose market-data score bound is more than this below 60; off by default. "
+                             "0 saves the most requests, 24.5 never misses a coin for lack of a MACD/StochRSI "
+                             "crossover; pick one with prescreen.tradeoff on a full scan")
+    parser.add_argument("--lazy", action="store_true",
+                        help="stop scoring a coin once 60 is out of reach; the dashboard cannot re-rank such coins")
+    parser.add_argument("--events-port", type=int,
+                        help="push signal events as Server-Sent Events on http://127.0.0.1:PORT/events")
+    args = parser.parse_args()
+    if args.metrics_port:
+        serve_prometheus(args.metrics_port)
+    hub = tracker = None
+    if args.events_port:
+        hub, tracker = EventHub(), SignalEventTracker()
+        serve_events(args.events_port, hub)
+
+    schedulers = {}
+    if args.refresh_budget > 0:
+        per_mode = max(1, args.refresh_budget // len(args.mode))
+        schedulers = {mode: RefreshScheduler(per_mode, cycle_seconds=args.interval) for mode in args.mode}
+
+    scorer = ParallelScorer(args.score_workers, args.score_chunk_size) if args.score_workers > 0 else None
+    # Correlation/beta state carried between cycles, so each scan only adds the new bars
+    structures = {mode: MarketStructure(mode_timeframe(mode == "full")) for mode in args.mode}
+
+    last_prune = None
+    while True:
+        cycle_started = time.time()
+        # Modes in one cycle share identical requests (e.g. the markets pages) through get_json
+        new_cycle()
+        for mode in args.mode:
+            try:
+                snapshot = scan_and_publish(mode == "full", top_n=args.top_n, scheduler=schedulers.get(mode),
+                                            scorer=scorer,
+                                            prescreen_margin=args.prescreen_margin,
+                                            lazy=args.lazy, structure=structures[mode],
+                                            on_signal=None if hub is None else
+                                            (lambda sig, mode=mode: hub.publish(tracker.update(mode, sig))))
+                print(f"[scanner] {mode}: {len(snapshot['signals'])} signals in {snapshot['scan_seconds']}s")
+            except Exception as e:
+                print(f"[scanner] {mode} failed: {e}")
+        if last_prune is None or cycle_started - last_prune >= CANDLE_PRUNE_INTERVAL_SECONDS:
+            with metrics.timer("candle_store.prune"):
+                get_candle_store().prune((cycle_started - CANDLE_RETENTION_DAYS * 86400) * 1000)
+            last_prune = cycle_started
+        if args.metrics_file:
+            metrics.write(args.metrics_file)
+        if args.once:
+            if scorer is not None:
+                scorer.close()
+            break
+        time.sleep(max(0.0, args.interval - (time.time() - cycle_started)))
+
+if __name__ == "__main__":
+    main()
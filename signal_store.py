@@ -0,0 +1,140 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+
+# Append-only history of ranked scan results. Each published scan is one row in `scans`
+# plus one row per signal; nothing is updated in place, so readers never block the scanner.
+
+class SignalStore:
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS scans (
+                scan_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scanned_at REAL NOT NULL,
+                mode TEXT NOT NULL,
+                coins INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS scans_by_mode_time ON scans (mode, scanned_at);
+            CREATE TABLE IF NOT EXISTS signals (
+                scan_id INTEGER NOT NULL,
+                coin_id TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                buy_score REAL NOT NULL,
+                price REAL,
+                buy_low REAL,
+                buy_high REAL,
+                subscores TEXT,
+                partial INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (scan_id, coin_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS signals_by_coin ON signals (coin_id, scan_id);
+        """)
+        self.conn.commit()
+
+    def append(self, signals, mode, scanned_at=None):
+        # signals ranked best first, as run_scan returns them; returns the new scan_id
+        scanned_at = time.time() if scanned_at is None else scanned_at
+        with self._lock:
+            cursor = self.conn.execute("INSERT INTO scans (scanned_at, mode, coins) VALUES (?, ?, ?)",
+                                       (scanned_at, mode, len(signals)))
+            scan_id = cursor.lastrowid
+            self.conn.executemany("INSERT INTO signals VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+                (scan_id, sig["id"], rank, sig["buy_score"], sig["price"], sig["buy_range"][0], sig["buy_range"][1],
+                 json.dumps(sig["subscores"]), int(sig.get("partial", False)))
+                for rank, sig in enumerate(signals, start=1)
+            ])
+            self.conn.commit()
+        return scan_id
+
+    def latest_scan_id(self, mode, before=None):
+        query = "SELECT MAX(scan_id) FROM scans WHERE mode=?"
+        params = [mode]
+        if before is not None:
+            query += " AND scan_id < ?"
+            params.append(before)
+        with self._lock:
+            return self.conn.execute(query, params).fetchone()[0]
+
+    def load_scan(self, scan_id, limit=None, threshold=None):
+        # Ranked rows of one scan, optionally only the top `limit` with buy_score >= threshold
+        query = ("SELECT coin_id, rank, buy_score, price, buy_low, buy_high, subscores, partial "
+                 "FROM signals WHERE scan_id=?")
+        params = [scan_id]
+        if threshold is not None:
+            query += " AND buy_score >= ?"
+            params.append(threshold)
+        query += " ORDER BY rank"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [{
+            "id": coin_id, "rank": rank, "buy_score": buy_score, "price": price,
+            "buy_range": (buy_low, buy_high), "subscores": json.loads(subscores), "partial": bool(partial),
+        } for coin_id, rank, buy_score, price, buy_low, buy_high, subscores, partial in rows]
+
+    def diff(self, mode, scan_id=None, previous_id=None, limit=None, threshold=None):
+        # Coins that entered, left or moved rank between two scans of a mode (default: the
+        # latest and the one before it). limit/threshold restrict both sides to what is
+        # displayed, so entered/left mean entered or left the dashboard.
+        scan_id = scan_id if scan_id is not None else self.latest_scan_id(mode)
+        if scan_id is None:
+            return {"scan_id": None, "previous_id": None, "entered": [], "left": [], "moved": [], "changed": []}
+        previous_id = previous_id if previous_id is not None else self.latest_scan_id(mode, before=scan_id)
+        current = {row["id"]: row for row in self.load_scan(scan_id, limit, threshold)}
+        previous = {} if previous_id is None else {row["id"]: row
+                                                   for row in self.load_scan(previous_id, limit, threshold)}
+        moved = []
+        changed = []
+        for coin_id, row in current.items():
+            before = previous.get(coin_id)
+            if before is None:
+                continue
+            if before["rank"] != row["rank"]:
+                moved.append({"id": coin_id, "from": before["rank"], "to": row["rank"]})
+            if (before["buy_score"], before["price"], before["subscores"]) != \
+                    (row["buy_score"], row["price"], row["subscores"]):
+                changed.append(coin_id)
+        return {
+            "scan_id": scan_id,
+            "previous_id": previous_id,
+            "entered": [coin_id for coin_id in current if coin_id not in previous],
+            "left": [coin_id for coin_id in previous if coin_id not in current],
+            "moved": moved,
+            "changed": changed,
+        }
+
+    def history(self, coin_id, mode=None, since=None):
+        # One row per scan the coin appeared in, oldest first
+        query = ("SELECT s.scanned_at, s.mode, g.rank, g.buy_score, g.price, g.partial "
+                 "FROM signals g JOIN scans s USING (scan_id) WHERE g.coin_id=?")
+        params = [coin_id]
+        if mode is not None:
+            query += " AND s.mode=?"
+            params.append(mode)
+        if since is not None:
+            query += " AND s.scanned_at >= ?"
+            params.append(since)
+        with self._lock:
+            rows = self.conn.execute(query + " ORDER BY g.scan_id", params).fetchall()
+        df = pd.DataFrame(rows, columns=["scanned_at", "mode", "rank", "buy_score", "price", "partial"])
+        df["scanned_at"] = pd.to_datetime(df["scanned_at"], unit="s")
+        return df
+
+    def prune(self, before):
+        # Drops scans (and their signals) older than `before` (unix seconds)
+        with self._lock:
+            self.conn.execute("DELETE FROM signals WHERE scan_id IN (SELECT scan_id FROM scans WHERE scanned_at < ?)",
+                              (before,))
+            self.conn.execute("DELETE FROM scans WHERE scanned_at < ?", (before,))
+            self.conn.commit()
@@ -0,0 +1,65 @@
+# single_flight.py
+
+import threading
+import time
+from metrics import metrics
+
+class _Call:
+    __slots__ = ("done", "result", "error", "finished_at")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+class SingleFlight:
+    # Concurrent or repeated calls with the same key inside `window` seconds share one
+    # execution and its result. Failures are shared with callers already waiting but are
+    # not kept, so the next call retries. Shared results must be treated as read-only.
+    # Once forget() has been called the process is taken to run in cycles (the scanner):
+    # results are then kept until the next forget() instead of expiring after `window`.
+    def __init__(self, window, clock=time.monotonic):
+        self.window = window
+        self.clock = clock
+        self.cycles = False
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _expired(self, call, now):
+        return call.finished_at is not None and not self.cycles and now - call.finished_at > self.window
+
+    def do(self, key, fn):
+        with self._lock:
+            now = self.clock()
+            call = self._calls.get(key)
+            if call is not None and self._expired(call, now):
+                call = None
+            leader = call is None
+            if leader:
+                # Expired results are dropped as new keys come in, so a process that never
+                # calls forget() (the dashboard) only holds the last window's responses
+                self._calls = {k: c for k, c in self._calls.items() if not self._expired(c, now)}
+                call = self._calls[key] = _Call()
+        if not leader:
+            metrics.incr("single_flight.shared")
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+            with self._lock:
+                call.finished_at = self.clock()
+                if call.error is not None and self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def forget(self):
+        # Starts a new refresh cycle: completed results are dropped, in-flight calls kept
+        with self._lock:
+            self.cycles = True
+            self._calls = {k: c for k, c in self._calls.items() if c.finished_at is None}
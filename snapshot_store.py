@@ -0,0 +1,37 @@
+
+import json
+import os
+import tempfile
+import time
+from config import SNAPSHOT_DIR
+
+def snapshot_path(use_market_chart, directory=SNAPSHOT_DIR):
+    mode = "full" if use_market_chart else "light"
+    return os.path.join(directory, f"scan_{mode}.json")
+
+def publish_snapshot(snapshot, path):
+    # Write to a temp file in the same directory and rename over the old snapshot,
+    # so readers see either the previous scan or the new one, never a partial file
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def load_snapshot(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def snapshot_age(snapshot, now=None):
+    return (now or time.time()) - snapshot["generated_at"]
@@ -0,0 +1,10 @@
+from event_server import SignalEventTracker
+
+def test_event_subscores_are_a_snapshot():
+    sig = {"id": "coin", "symbol": "COIN", "buy_score": 70.0, "price": 1.0, "buy_range": (0.985, 1.015),
+           "subscores": {"RSI": 80.0}}
+    events = SignalEventTracker().update("light", sig)
+    assert [event["type"] for event in events] == ["crossed_above"]
+    # The scanner adds Decoupling to the signal after it has been published
+    sig["subscores"]["Decoupling"] = 40
+    assert events[0]["subscores"] == {"RSI": 80.0}
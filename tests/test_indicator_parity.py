@@ -0,0 +1,64 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from batch_indicator_engine import BatchIndicatorEngine
+from indicator_engine_v2 import IndicatorEngineV2
+from ta_reference import TaReferenceEngine
+
+# Around every warm-up edge: RSI(14), StochRSI(14, 14, 3), MACD(26, 9), ADX(14), EMA(50), volume(20)
+LENGTHS = [0, 1, 2, 5, 13, 14, 15, 19, 20, 21, 27, 28, 29, 30, 33, 34, 35, 41, 42, 49, 50, 51, 60, 150, 288]
+
+def make_frame(n, seed, volume=True, flat=False, gap=False):
+    rng = np.random.default_rng(seed)
+    close = np.full(n, 100.0) if flat else 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    frame = pd.DataFrame({
+        "timestamp": pd.to_datetime(1_700_000_000_000 + np.arange(n) * 1_800_000, unit="ms"),
+        "open": close,
+        "high": close * (1 + rng.uniform(0, 0.01, n)),
+        "low": close * (1 - rng.uniform(0, 0.01, n)),
+        "close": close,
+    })
+    if volume:
+        frame["volume"] = rng.lognormal(10, 1, n)
+    if gap and n > 3:
+        frame.loc[1, "close"] = np.nan
+    return frame
+
+CASES = {
+    f"n{n}-{kind}": make_frame(n, seed=n, volume=kind != "no-volume", flat=kind == "flat", gap=kind == "gap")
+    for n in LENGTHS for kind in ("volume", "no-volume", "flat", "gap")
+}
+# Enough random walks that MACD and StochRSI crossovers and the ADX bands all occur
+CASES.update({f"walk{seed}": make_frame(60, seed=1000 + seed) for seed in range(150)})
+
+def reference(frame):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        engine = TaReferenceEngine(frame)
+        return dict(engine.calculate_all()), engine.calculate_weighted_score()
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_v2_matches_ta(name):
+    scores, weighted = reference(CASES[name])
+    engine = IndicatorEngineV2(CASES[name])
+    assert dict(engine.calculate_all()) == scores
+    assert engine.calculate_weighted_score() == weighted
+
+def test_batch_matches_ta():
+    engine = BatchIndicatorEngine.from_frames(CASES)
+    subscores = engine.calculate_all()
+    weighted = engine.calculate_weighted_score()
+    for name, frame in CASES.items():
+        scores, score = reference(frame)
+        assert subscores[name] == scores, name
+        assert weighted[name] == score, name
+
+def test_frame_without_timestamp():
+    frame = make_frame(60, seed=7).drop(columns="timestamp")
+    scores, weighted = reference(frame)
+    engine = IndicatorEngineV2(frame)
+    assert dict(engine.calculate_all()) == scores
+    assert engine.calculate_weighted_score() == weighted
+    batch = BatchIndicatorEngine.from_frames({"coin": frame})
+    assert batch.calculate_all()["coin"] == scores
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from candle_series import CandleSeries
+from indicator_engine_v2 import IndicatorEngineV2
+from indicator_stream import IndicatorStream
+
+def make_frame(n, seed, volume=True, rounded=False):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    if rounded:
+        # Flat stretches: zero gains and losses, equal RSI highs and lows
+        close = np.round(close, 1)
+    frame = pd.DataFrame({
+        "timestamp": 1_700_000_000_000 + np.arange(n) * 1_800_000,
+        "open": close,
+        "high": close * (1 + rng.uniform(0, 0.01, n)),
+        "low": close * (1 - rng.uniform(0, 0.01, n)),
+        "close": close,
+    })
+    if volume:
+        frame["volume"] = rng.lognormal(10, 1, n)
+    return frame
+
+CASES = [(seed, volume, rounded) for seed in range(8) for volume in (True, False) for rounded in (False, True)]
+
+@pytest.mark.parametrize("seed,volume,rounded", CASES)
+def test_stream_matches_full_recompute(seed, volume, rounded):
+    frame = make_frame(90, seed, volume=volume, rounded=rounded)
+    stream = IndicatorStream()
+    for i, candle in enumerate(frame.to_dict("records")):
+        scores = dict(stream.update(candle))
+        engine = IndicatorEngineV2(frame.iloc[:i + 1])
+        assert scores == dict(engine.calculate_all()), i
+        assert stream.calculate_weighted_score() == engine.calculate_weighted_score(), i
+
+def test_from_frame_skips_nan_rows():
+    frame = make_frame(60, 99)
+    frame.loc[[3, 40], "close"] = np.nan
+    stream = IndicatorStream.from_frame(frame)
+    engine = IndicatorEngineV2(frame)
+    assert dict(stream.scores) == dict(engine.calculate_all())
+    assert stream.calculate_weighted_score() == engine.calculate_weighted_score()
+
+def test_closed_candles_of_a_forming_series():
+    # The stream only takes closed candles; for resampled input ending in a forming candle
+    # its Volume is the one IndicatorEngineV2 reads at the last closed candle
+    frame = make_frame(90, 5)
+    series = CandleSeries.from_frame(frame)
+    forming = CandleSeries(*(getattr(series, col) for col in CandleSeries.__slots__[:-1]), forming=True)
+    stream = IndicatorStream.from_frame(frame.iloc[:-1])
+    engine = IndicatorEngineV2(forming)
+    assert dict(stream.scores) == dict(IndicatorEngineV2(frame.iloc[:-1]).calculate_all())
+    assert stream.scores['Volume'] == engine.calculate_all()['Volume']
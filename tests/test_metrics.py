@@ -0,0 +1,25 @@
+import os
+import threading
+from metrics import Metrics
+
+def test_concurrent_writes_do_not_race(tmp_path):
+    registry = Metrics()
+    registry.incr("api.calls")
+    path = str(tmp_path / "metrics.prom")
+    errors = []
+
+    def writer():
+        for _ in range(200):
+            try:
+                registry.write(path)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=writer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert "api.calls" in open(path).read()
+    assert os.listdir(tmp_path) == ["metrics.prom"]
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from candle_series import CandleSeries
+from config import BUY_THRESHOLD
+from indicator_engine_v2 import IndicatorEngineV2
+from prescreen import CROSS_POINTS, prescreen, score_bounds, tradeoff
+from resample import TIMEFRAME_MS, resample
+
+START = 1_700_000_000_000 // TIMEFRAME_MS["30m"] * TIMEFRAME_MS["30m"]
+DAY = 288
+
+def market_and_score(seed):
+    # Two days of 5m market_chart points: the markets row is built from the last day, the
+    # buy score from the Light-mode 30m candles, as the scanner would see them
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, rng.uniform(0.002, 0.012), 2 * DAY)))
+    volume = 1e9 * np.exp(np.cumsum(rng.normal(0, 0.01, 2 * DAY)))
+    finest = CandleSeries(START + np.arange(2 * DAY, dtype=np.int64) * TIMEFRAME_MS["5m"],
+                          close, close, close, close, volume)
+    engine = IndicatorEngineV2(resample(finest, "30m", now_ms=int(finest.timestamp[-1]) + 1))
+    engine.calculate_all()
+    row = {
+        "id": f"coin-{seed}",
+        "current_price": close[-1],
+        "price_change_percentage_1h_in_currency": 100 * (close[-1] / close[-13] - 1),
+        "price_change_percentage_24h_in_currency": 100 * (close[-1] / close[-DAY - 1] - 1),
+        "high_24h": close[-DAY:].max(),
+        "low_24h": close[-DAY:].min(),
+    }
+    return row, engine.calculate_weighted_score()
+
+ROWS, SCORES = zip(*(market_and_score(seed) for seed in range(400)))
+UNIVERSE = pd.DataFrame(list(ROWS))
+BUY_SCORES = dict(zip(UNIVERSE["id"], SCORES))
+
+def test_prescreen_keeps_qualifying_coins_and_skips_others():
+    qualifying = np.array(SCORES) >= BUY_THRESHOLD
+    assert qualifying.any()
+    keep = prescreen(UNIVERSE, margin=10)
+    assert keep[qualifying].all()
+    assert (~keep).sum() > 0
+
+def test_margin_trades_fetches_for_recall():
+    rows = tradeoff(UNIVERSE, BUY_SCORES, margins=(0, 10, CROSS_POINTS))
+    saved = [row["fetches_saved"] for row in rows]
+    assert saved[0] > saved[1] > 0
+    assert rows[1]["recall"] == 1.0
+    # With room for both crossovers the bound is the crossover-assuming one, which skips nothing
+    assert saved[2] == 0.0
+    assert np.allclose(score_bounds(UNIVERSE) + CROSS_POINTS, score_bounds(UNIVERSE, assume_crosses=True))
@@ -0,0 +1,54 @@
+import numpy as np
+from batch_indicator_engine import BatchIndicatorEngine
+from candle_series import CandleSeries
+from indicator_engine_v2 import IndicatorEngineV2
+from parallel_scoring import ParallelScorer
+from resample import TIMEFRAME_MS, resample
+
+START = 1_700_000_000_000 // TIMEFRAME_MS["30m"] * TIMEFRAME_MS["30m"]
+
+def five_minute_series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    # market_chart total_volumes: a rolling 24h figure per sample
+    volume = 1e9 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return CandleSeries(START + np.arange(n, dtype=np.int64) * TIMEFRAME_MS["5m"], close, close, close, close, volume)
+
+def closed_only(series):
+    return CandleSeries(*(getattr(series, col)[:-1] for col in CandleSeries.__slots__[:-1]))
+
+def test_volume_is_last_value_per_bucket():
+    finest = five_minute_series(6 * 40 + 2)
+    now_ms = int(finest.timestamp[-1]) + 1
+    candles = resample(finest, "30m", now_ms=now_ms)
+    assert len(candles) == 41
+    last = np.append(np.arange(5, 240, 6), len(finest) - 1)
+    assert np.array_equal(candles.close, finest.close[last])
+    assert np.array_equal(candles.volume, finest.volume[last])
+    assert candles.forming
+    assert not resample(finest, "30m", now_ms=START + 41 * TIMEFRAME_MS["30m"]).forming
+
+def test_forming_bucket_left_out_of_volume_subscore():
+    for seed in range(20):
+        finest = five_minute_series(6 * 40 + 3, seed)
+        candles = resample(finest, "30m", now_ms=int(finest.timestamp[-1]) + 1)
+        # Everything else still sees the forming candle; only Volume is read one candle back
+        forming = IndicatorEngineV2(CandleSeries(*(getattr(candles, col) for col in CandleSeries.__slots__[:-1])))
+        expected = dict(forming.calculate_all())
+        expected['Volume'] = IndicatorEngineV2(closed_only(candles)).calculate_all()['Volume']
+        assert dict(IndicatorEngineV2(candles).calculate_all()) == expected
+        batch = BatchIndicatorEngine.from_series(["coin"], [candles])
+        assert batch.calculate_all()["coin"] == expected
+        subscores, _ = ParallelScorer(workers=1).score([("coin", candles)])["coin"]
+        assert subscores == expected
+
+def test_forming_set_when_already_at_timeframe():
+    # One point per 5m bucket takes the shortcut; the newest still counts as forming
+    finest = five_minute_series(100)
+    last = int(finest.timestamp[-1])
+    assert resample(finest, "5m", now_ms=last + 1).forming
+    assert not resample(finest, "5m", now_ms=last + TIMEFRAME_MS["5m"]).forming
+    # With jitter putting two points into the last bucket, the flag is the same
+    jittered = CandleSeries(np.append(finest.timestamp, last + 60_000), *(np.append(getattr(finest, col), 1.0)
+                            for col in ("open", "high", "low", "close", "volume")))
+    assert resample(jittered, "5m", now_ms=last + 61_000).forming
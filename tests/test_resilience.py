@@ -0,0 +1,65 @@
+import threading
+import pytest
+from resilience import ResilientCaller
+
+class Limiter:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.taken = 0
+
+    def try_acquire(self, tokens=1):
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            self.taken += tokens
+            return True
+        return False
+
+def flaky(failures):
+    calls = []
+    def fn():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise ConnectionError("down")
+        return "ok"
+    return fn, calls
+
+def test_retry_charges_limiter():
+    limiter = Limiter(5)
+    caller = ResilientCaller(limiter=limiter)
+    fn, calls = flaky(1)
+    assert caller.call("e", fn) == "ok"
+    assert len(calls) == 2 and limiter.taken == 1
+
+def test_retry_skipped_without_token():
+    limiter = Limiter(0)
+    caller = ResilientCaller(limiter=limiter)
+    fn, calls = flaky(1)
+    with pytest.raises(ConnectionError):
+        caller.call("e", fn)
+    assert len(calls) == 1
+
+def test_hedge_skipped_without_token():
+    release = threading.Event()
+    calls = []
+    def slow():
+        calls.append(1)
+        release.wait(1)
+        return "ok"
+    caller = ResilientCaller(limiter=Limiter(0))
+    threading.Timer(1.3, release.set).start()
+    assert caller.call("e", slow) == "ok"
+    assert len(calls) == 1
+
+def test_hedge_charges_limiter():
+    release = threading.Event()
+    calls = []
+    def slow():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(3)
+        return "ok"
+    limiter = Limiter(5)
+    caller = ResilientCaller(limiter=limiter)
+    assert caller.call("e", slow) == "ok"
+    release.set()
+    assert len(calls) == 2 and limiter.taken == 1
@@ -0,0 +1,18 @@
+import display_signal_card
+from display_signal_card import cached_card_html
+
+def make_signal(**fields):
+    sig = {"id": "coin", "name": "Coin", "symbol": "COIN", "image": "", "price": 1.0, "buy_score": 70.0,
+           "buy_range": (0.985, 1.015), "analysis": "", "subscores": {}, "btc_beta": 1.0, "btc_corr": 0.5}
+    sig.update(fields)
+    return sig
+
+def test_card_rebuilt_when_btc_fields_change():
+    display_signal_card._card_cache.clear()
+    first = {"scan_id": 1, "previous_id": None, "entered": ["coin"], "changed": []}
+    second = {"scan_id": 2, "previous_id": 1, "entered": [], "changed": []}
+    markup = cached_card_html(make_signal(), "light", first)
+    # Unchanged coin: the previous scan's markup is reused
+    assert cached_card_html(make_signal(), "light", second) is markup
+    rebuilt = cached_card_html(make_signal(btc_beta=2.0), "light", second)
+    assert "β 1.00" in markup and "β 2.00" in rebuilt
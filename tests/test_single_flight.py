@@ -0,0 +1,38 @@
+from single_flight import SingleFlight
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_results_shared_within_window():
+    clock = Clock()
+    flights = SingleFlight(5, clock=clock)
+    calls = []
+    assert flights.do("a", lambda: calls.append(1) or len(calls)) == 1
+    clock.now = 4.0
+    assert flights.do("a", lambda: calls.append(1) or len(calls)) == 1
+    clock.now = 10.0
+    assert flights.do("a", lambda: calls.append(1) or len(calls)) == 2
+
+def test_expired_entries_evicted_without_forget():
+    clock = Clock()
+    flights = SingleFlight(5, clock=clock)
+    for i in range(100):
+        clock.now = float(i)
+        flights.do(i, lambda: i)
+    # Only keys finished within the last window are still held
+    assert sorted(flights._calls) == list(range(94, 100))
+
+def test_results_kept_for_the_cycle_after_forget():
+    clock = Clock()
+    flights = SingleFlight(5, clock=clock)
+    calls = []
+    flights.forget()
+    assert flights.do("a", lambda: calls.append(1) or len(calls)) == 1
+    clock.now = 60.0
+    assert flights.do("a", lambda: calls.append(1) or len(calls)) == 1
+    flights.forget()
+    assert flights.do("a", lambda: calls.append(1) or len(calls)) == 2
@@ -1,9 +1,11 @@
 
 from datetime import datetime
+from metrics import metrics
 
 def log_resolution(coin_id, resolution_type, status):
     timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] [{coin_id}] Resolution: {resolution_type} | Status: {status}")
+    metrics.incr("resolution.success" if status == "Success" else "resolution.failed")
 
 def format_duration(seconds):
     days = seconds // 86400